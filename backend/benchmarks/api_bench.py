@@ -0,0 +1,308 @@
+"""Load test and micro-benchmark for the REST API and Socket.IO layer.
+
+Seeds a fresh SQLite database with rooms, members, rounds, tasks and votes,
+then drives the real app (src/main.py) through the Flask and Socket.IO test
+clients with realistic flows: join a room, create a task, upload proof,
+approve, flag, vote and poll. Reports throughput and p50/p99 latency per
+route and writes them as JSON for comparison across commits:
+
+    python benchmarks/api_bench.py --output bench-before.json
+    python benchmarks/api_bench.py --compare bench-before.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rooms', type=int, default=20, help='rooms to seed')
+    parser.add_argument('--members', type=int, default=8, help='members per room')
+    parser.add_argument('--rounds', type=int, default=10, help='rounds per room (the last one stays active)')
+    parser.add_argument('--tasks', type=int, default=3, help='tasks per member per round')
+    parser.add_argument('--votes', type=float, default=0.7, help='share of seeded tasks that get an approval vote')
+    parser.add_argument('--flows', type=int, default=200, help='member flows to run after seeding')
+    parser.add_argument('--seed', type=int, default=1, help='random seed for seeding and flows')
+    parser.add_argument('--db', help='database file to create (default: a temporary file)')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='print p50/p99 changes against an earlier JSON result')
+    return parser.parse_args()
+
+def load_app(db_path, upload_dir):
+    """Import src.main against a benchmark database and upload directory"""
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['UPLOAD_DIR'] = upload_dir
+    os.environ.setdefault('SERVER_MODE', 'threading')
+    sys.path.insert(0, BACKEND_DIR)
+    import src.main as main
+    return main
+
+# Seeding
+
+def seed_database(main, args, rng):
+    """Insert rooms, members, rounds, tasks and votes directly through the ORM"""
+    from src.models.user import db, User, Room, RoomMember, Round, Task, Vote
+    from src.leaderboard import rebuild_round_scores
+
+    templates = ('time-boxed', 'quantitative', 'milestone', 'qualitative')
+    rooms = []
+    now = datetime.utcnow()
+    with main.app.app_context():
+        for r in range(args.rooms):
+            room = Room(code=f'B{r:05d}', name=f'Bench room {r}')
+            db.session.add(room)
+            users = [User(name=f'bench-{r}-{m}') for m in range(args.members)]
+            db.session.add_all(users)
+            db.session.flush()
+            db.session.add_all([
+                RoomMember(room_id=room.id, user_id=user.id, is_host=(m == 0))
+                for m, user in enumerate(users)
+            ])
+
+            for n in range(args.rounds):
+                active = n == args.rounds - 1
+                start = now - timedelta(days=7 * (args.rounds - n))
+                round_obj = Round(
+                    room_id=room.id,
+                    start_at=start,
+                    end_at=start + timedelta(days=7),
+                    status='active' if active else 'completed',
+                    created_at=start
+                )
+                db.session.add(round_obj)
+                db.session.flush()
+
+                for creator in users:
+                    for t in range(args.tasks):
+                        approved = None
+                        if rng.random() < args.votes:
+                            approved = rng.random() < 0.85
+                        task = Task(
+                            round_id=round_obj.id,
+                            creator_id=creator.id,
+                            template=rng.choice(templates),
+                            title=f'Seeded task {t}',
+                            points=rng.randint(10, 60),
+                            proof_type='text',
+                            proof_url='done',
+                            approved=approved,
+                            created_at=start + timedelta(minutes=rng.randint(0, 7 * 24 * 60)),
+                            completed_at=start
+                        )
+                        db.session.add(task)
+                        if approved is not None:
+                            voter = rng.choice([user for user in users if user is not creator])
+                            db.session.add(Vote(
+                                round_id=round_obj.id, voter_id=voter.id, task=task,
+                                vote=approved, vote_type='approval'
+                            ))
+
+            db.session.commit()
+            rooms.append({
+                'id': room.id,
+                'code': room.code,
+                'round_id': round_obj.id,
+                'user_ids': [user.id for user in users]
+            })
+
+        rebuild_round_scores()
+        db.session.commit()
+    return rooms
+
+# Measurement
+
+class Recorder:
+    """Collects latencies and failures per route label"""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+
+    def record(self, label, elapsed, ok=True):
+        self.samples.setdefault(label, []).append(elapsed)
+        if not ok:
+            self.errors[label] = self.errors.get(label, 0) + 1
+
+    def http(self, label, method, url, expect=(200, 201), **kwargs):
+        started = time.perf_counter()
+        response = method(url, **kwargs)
+        self.record(label, time.perf_counter() - started, response.status_code in expect)
+        return response
+
+    def socket(self, label, client, event, data):
+        started = time.perf_counter()
+        client.emit(event, data)
+        self.record(label, time.perf_counter() - started, client.is_connected())
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+def summarize(recorder):
+    """Per-route count, errors, throughput and latency percentiles (milliseconds)"""
+    routes = {}
+    for label, values in sorted(recorder.samples.items()):
+        values = sorted(values)
+        total = sum(values)
+        routes[label] = {
+            'count': len(values),
+            'errors': recorder.errors.get(label, 0),
+            'ops_per_sec': len(values) / total if total else None,
+            'mean_ms': total / len(values) * 1000,
+            'p50_ms': percentile(values, 0.50) * 1000,
+            'p99_ms': percentile(values, 0.99) * 1000,
+            'max_ms': values[-1] * 1000
+        }
+    return routes
+
+# Flows
+
+def proof_image(rng):
+    """A small unique PNG, or None when Pillow is not installed"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    image = Image.new('RGB', (96, 96), tuple(rng.randrange(256) for _ in range(3)))
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+def member_flow(main, client, rec, room, rng, n):
+    """One member's session: join, create, prove, review, flag, vote and poll"""
+    round_id = room['round_id']
+    reviewer, flagger, voter = rng.sample(room['user_ids'], 3)
+
+    joined = rec.http('POST /rooms/join', client.post, '/api/rooms/join',
+                      json={'code': room['code'], 'name': f'flow-{n}'}).get_json()
+    user_id = joined['user']['id']
+
+    sock = main.socketio.test_client(main.app, flask_test_client=client)
+    rec.socket('socket join_room', sock, 'join_room', {'user_id': user_id, 'room_id': room['id']})
+
+    task = rec.http('POST /tasks', client.post, '/api/tasks', json={
+        'round_id': round_id, 'user_id': user_id, 'template_type': 'time-boxed',
+        'title': f'Flow task {n}', 'points': rng.randint(10, 60)
+    }).get_json()['task']
+
+    image = proof_image(rng)
+    if image is not None:
+        rec.http('POST /tasks/<id>/proof', client.post, f"/api/tasks/{task['id']}/proof",
+                 data={'proof_type': 'photo', 'file': (io.BytesIO(image), 'proof.png')},
+                 content_type='multipart/form-data')
+    else:
+        rec.http('POST /tasks/<id>/proof', client.post, f"/api/tasks/{task['id']}/proof",
+                 json={'proof_type': 'text', 'proof_url': 'done'})
+
+    rec.http('GET /rounds/<id>/pending-approvals', client.get, f'/api/rounds/{round_id}/pending-approvals')
+    rec.http('POST /tasks/<id>/approve', client.post, f"/api/tasks/{task['id']}/approve",
+             json={'approver_id': reviewer, 'approve': True})
+    if rng.random() < 0.3:
+        rec.http('POST /tasks/<id>/flag', client.post, f"/api/tasks/{task['id']}/flag",
+                 json={'flagger_id': flagger})
+        rec.http('POST /tasks/<id>/vote', client.post, f"/api/tasks/{task['id']}/vote",
+                 json={'voter_id': voter, 'vote': rng.random() < 0.7})
+
+    # Polling, including conditional re-polls answered from the ETag
+    for path, label in (
+        (f'/api/rounds/{round_id}/stats', 'GET /rounds/<id>/stats'),
+        (f'/api/rounds/{round_id}/tasks', 'GET /rounds/<id>/tasks'),
+        (f"/api/rooms/{room['id']}", 'GET /rooms/<id>'),
+        (f"/api/rooms/{room['id']}/active-round", 'GET /rooms/<id>/active-round'),
+    ):
+        response = rec.http(label, client.get, path)
+        etag = response.headers.get('ETag')
+        if etag:
+            rec.http(f'{label} (revalidate)', client.get, path,
+                     expect=(200, 304), headers={'If-None-Match': etag})
+
+    rec.socket('socket get_room_status', sock, 'get_room_status', {'room_id': room['id']})
+    rec.socket('socket leave_room', sock, 'leave_room', {})
+    sock.disconnect()
+
+def git_commit():
+    """Short hash of the checked-out commit, if available"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_report(result, baseline=None):
+    """Print a per-route table, with changes against a baseline result"""
+    header = f"{'route':44} {'count':>6} {'err':>4} {'ops/s':>9} {'p50 ms':>8} {'p99 ms':>8}"
+    print(header + ('   p50 / p99 vs baseline' if baseline else ''))
+    for label, stats in result['routes'].items():
+        line = (f"{label:44} {stats['count']:>6} {stats['errors']:>4} {stats['ops_per_sec'] or 0:>9.0f} "
+                f"{stats['p50_ms']:>8.2f} {stats['p99_ms']:>8.2f}")
+        before = (baseline or {}).get('routes', {}).get(label)
+        if before:
+            line += (f"   {(stats['p50_ms'] / before['p50_ms'] - 1) * 100:+6.1f}%"
+                     f" / {(stats['p99_ms'] / before['p99_ms'] - 1) * 100:+6.1f}%")
+        print(line)
+    print(f"\n{result['flows']} flows in {result['flow_seconds']:.2f}s "
+          f"({result['flows_per_sec']:.1f} flows/s), seeded in {result['seed_seconds']:.2f}s")
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix='climbclash-bench-')
+    db_path = os.path.abspath(args.db) if args.db else os.path.join(workdir, 'app.db')
+    if os.path.exists(db_path):
+        sys.exit(f'{db_path} already exists; pass a new --db path')
+
+    app_module = load_app(db_path, os.path.join(workdir, 'uploads'))
+
+    started = time.perf_counter()
+    rooms = seed_database(app_module, args, rng)
+    seed_seconds = time.perf_counter() - started
+
+    client = app_module.app.test_client()
+    recorder = Recorder()
+    started = time.perf_counter()
+    # Socket handlers print every connect and join; keep them out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        for n in range(args.flows):
+            member_flow(app_module, client, recorder, rng.choice(rooms), rng, n)
+    flow_seconds = time.perf_counter() - started
+
+    result = {
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'compare', 'db')},
+        'seed_seconds': seed_seconds,
+        'flows': args.flows,
+        'flow_seconds': flow_seconds,
+        'flows_per_sec': args.flows / flow_seconds if flow_seconds else None,
+        'routes': summarize(recorder)
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f'Results written to {args.output}')
+
+    app_module.thumbnail_pipeline.shutdown()
+
+if __name__ == '__main__':
+    main()
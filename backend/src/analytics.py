@@ -0,0 +1,179 @@
+from sqlalchemy import func
+from src.models.user import db, User, Round, Task, Vote
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; room analytics are unavailable without it
+    np = None
+
+# Room history analytics. Task and vote columns for every round of a room are
+# loaded with one query each and turned into arrays indexed by user, round and
+# template; every statistic is then a handful of whole-array operations
+# (bincount, argsort, diff) instead of a Python loop per round or per task.
+
+TASK_PENDING, TASK_REJECTED, TASK_APPROVED = -1, 0, 1
+
+def analytics_available():
+    """Whether NumPy is installed"""
+    return np is not None
+
+def load_room_history(room_id):
+    """Rounds, tasks and approval votes of a room as column lists"""
+    rounds = db.session.query(Round.id, Round.start_at, Round.status).filter(
+        Round.room_id == room_id
+    ).order_by(Round.created_at.asc(), Round.id.asc()).all()
+
+    tasks = db.session.query(
+        Task.round_id,
+        Task.creator_id,
+        Task.template,
+        Task.points * func.coalesce(Task.difficulty_multiplier, 1.0),
+        Task.approved
+    ).join(Round, Task.round_id == Round.id).filter(Round.room_id == room_id).all()
+
+    approvals = db.session.query(Vote.voter_id).join(Round, Vote.round_id == Round.id).filter(
+        Round.room_id == room_id,
+        Vote.vote_type == 'approval'
+    ).all()
+
+    return rounds, tasks, [voter_id for voter_id, in approvals]
+
+def task_arrays(rounds, tasks):
+    """Index arrays for task columns; user and template labels are returned alongside"""
+    round_index = {round_id: i for i, (round_id, _, _) in enumerate(rounds)}
+    round_ids, creator_ids, templates, points, approved = zip(*tasks) if tasks else ((),) * 5
+
+    task_round = np.fromiter((round_index[round_id] for round_id in round_ids), dtype=np.int64, count=len(tasks))
+    users, task_user = np.unique(np.array(creator_ids, dtype=str), return_inverse=True)
+    template_names, task_template = np.unique(np.array(templates, dtype=str), return_inverse=True)
+    task_points = np.array([value or 0.0 for value in points], dtype=np.float64)
+    task_status = np.fromiter(
+        (TASK_PENDING if value is None else TASK_APPROVED if value else TASK_REJECTED for value in approved),
+        dtype=np.int8,
+        count=len(tasks)
+    )
+    return users, template_names, task_round, task_user, task_template, task_points, task_status
+
+def round_matrix(task_user, task_round, weights, n_users, n_rounds):
+    """Sum of weights per (user, round) as an n_users x n_rounds matrix"""
+    flat = np.bincount(task_user * n_rounds + task_round, weights=weights, minlength=n_users * n_rounds)
+    return flat.reshape(n_users, n_rounds)
+
+def rank_matrix(points, played):
+    """Leaderboard rank per (user, round); 0 where the user scored nothing that round.
+
+    Ranks are competition ranks like assign_ranks: tied users share the rank
+    of the first of them, i.e. 1 + the number of strictly higher scores.
+    """
+    # Users without an approved task sort after everyone who played
+    keys = np.where(played, points, -np.inf)
+    order = np.argsort(-keys, axis=0, kind='stable')
+    sorted_keys = np.take_along_axis(keys, order, axis=0)
+    positions = np.broadcast_to(np.arange(points.shape[0])[:, None], order.shape)
+    # A tie keeps the position where its run of equal scores started
+    starts = np.ones(order.shape, dtype=bool)
+    starts[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    sorted_ranks = np.maximum.accumulate(np.where(starts, positions, 0), axis=0) + 1
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, sorted_ranks, axis=0)
+    return np.where(played, ranks, 0)
+
+def streaks(played):
+    """Longest and current run of consecutive rounds played, per user"""
+    n_users, n_rounds = played.shape
+    padded = np.zeros((n_users, n_rounds + 2), dtype=np.int8)
+    padded[:, 1:-1] = played
+    edges = np.diff(padded, axis=1)
+    start_rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    lengths = ends - starts
+
+    longest = np.zeros(n_users, dtype=np.int64)
+    np.maximum.at(longest, start_rows, lengths)
+    current = np.zeros(n_users, dtype=np.int64)
+    ongoing = ends == n_rounds
+    current[start_rows[ongoing]] = lengths[ongoing]
+    return longest, current
+
+def template_distributions(template_names, task_template, task_points, task_status):
+    """Point distribution of approved tasks per template"""
+    approved = task_status == TASK_APPROVED
+    templates = task_template[approved]
+    points = task_points[approved]
+    order = np.lexsort((points, templates))
+    templates, points = templates[order], points[order]
+    present, offsets, counts = np.unique(templates, return_index=True, return_counts=True)
+
+    distributions = []
+    for template, offset, count in zip(present, offsets, counts):
+        values = points[offset:offset + count]
+        p50, p90 = np.percentile(values, [50, 90])
+        distributions.append({
+            'template': str(template_names[template]),
+            'approved_tasks': int(count),
+            'total_points': float(values.sum()),
+            'mean_points': float(values.mean()),
+            'min_points': float(values[0]),
+            'median_points': float(p50),
+            'p90_points': float(p90),
+            'max_points': float(values[-1])
+        })
+    return distributions
+
+def room_analytics(room_id):
+    """Per-user and per-template statistics across every round of a room"""
+    rounds, tasks, approval_voters = load_room_history(room_id)
+    n_rounds = len(rounds)
+    (creators, template_names, task_round, task_user,
+     task_template, task_points, task_status) = task_arrays(rounds, tasks)
+
+    # Users are everyone who created a task or cast an approval vote
+    users, user_index = np.unique(
+        np.concatenate([creators, np.array(approval_voters, dtype=str)]), return_inverse=True
+    )
+    task_user = user_index[:len(creators)][task_user]
+    voter_user = user_index[len(creators):]
+    n_users = len(users)
+
+    approved = task_status == TASK_APPROVED
+    created = np.bincount(task_user, minlength=n_users)
+    approved_count = np.bincount(task_user, weights=approved, minlength=n_users).astype(np.int64)
+    rejected_count = np.bincount(task_user, weights=task_status == TASK_REJECTED, minlength=n_users).astype(np.int64)
+    decided = approved_count + rejected_count
+    approvals_given = np.bincount(voter_user, minlength=n_users)
+
+    points = round_matrix(task_user, task_round, np.where(approved, task_points, 0.0), n_users, n_rounds)
+    played = round_matrix(task_user, task_round, approved, n_users, n_rounds) > 0
+    ranks = rank_matrix(points, played)
+    longest, current = streaks(played)
+    totals = points.sum(axis=1)
+
+    names = dict(db.session.query(User.id, User.name).filter(User.id.in_(users.tolist())))
+    user_stats = []
+    for i in np.argsort(-totals, kind='stable'):
+        user_stats.append({
+            'user_id': str(users[i]),
+            'user_name': names.get(str(users[i])),
+            'total_points': float(totals[i]),
+            'tasks_created': int(created[i]),
+            'tasks_approved': int(approved_count[i]),
+            'tasks_rejected': int(rejected_count[i]),
+            'tasks_pending': int(created[i] - decided[i]),
+            'approval_rate': float(approved_count[i] / decided[i]) if decided[i] else None,
+            'approvals_given': int(approvals_given[i]),
+            'rounds_played': int(played[i].sum()),
+            'rounds_won': int((ranks[i] == 1).sum()),
+            'longest_streak': int(longest[i]),
+            'current_streak': int(current[i]),
+            'points_by_round': points[i].tolist(),
+            'rank_trajectory': [int(rank) or None for rank in ranks[i]]
+        })
+
+    return {
+        'rounds': [
+            {'id': round_id, 'start_at': start_at, 'status': status}
+            for round_id, start_at, status in rounds
+        ],
+        'users': user_stats,
+        'templates': template_distributions(template_names, task_template, task_points, task_status)
+    }
@@ -0,0 +1,149 @@
+from collections import OrderedDict
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from src.config import CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS
+from src.models.user import db, User, Room, RoomMember, Round
+
+# Read-through caches for the lookups nearly every handler starts with: room
+# metadata, round -> room/status, room membership and each room's active
+# round. Values are plain dicts/ids, never ORM objects, so they can be shared
+# between requests. Entries are dropped after commit when a flush touched the
+# rows behind them, and expire after CACHE_TTL_SECONDS regardless, which
+# bounds staleness when another worker made the change.
+
+_MISSING = object()
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after `ttl` seconds"""
+
+    def __init__(self, maxsize=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (expires_at, value), least recently used first
+
+    def get(self, key, default=None):
+        """Cached value for a key, or `default` if missing or expired"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] < time.monotonic():
+                del self.entries[key]
+                return default
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entry when full"""
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def pop(self, key):
+        """Drop a key"""
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        """Drop every key"""
+        with self.lock:
+            self.entries.clear()
+
+    def get_or_load(self, key, loader):
+        """Cached value for a key, calling loader(key) and caching its result on a miss"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader(key)
+            self.set(key, value)
+        return value
+
+room_cache = TTLCache()          # room_id -> {id, code, name} or None
+round_cache = TTLCache()         # round_id -> {id, room_id, status} or None
+member_cache = TTLCache()        # room_id -> {user_id: user_name}
+active_round_cache = TTLCache()  # room_id -> active round_id or None
+
+def load_room(room_id):
+    """Room metadata from the database"""
+    row = db.session.query(Room.id, Room.code, Room.name).filter(Room.id == room_id).first()
+    return dict(row._mapping) if row else None
+
+def load_round(round_id):
+    """Round room/status from the database"""
+    row = db.session.query(Round.id, Round.room_id, Round.status).filter(Round.id == round_id).first()
+    return dict(row._mapping) if row else None
+
+def load_members(room_id):
+    """Member ids and names of a room from the database"""
+    rows = db.session.query(RoomMember.user_id, User.name).join(User).filter(RoomMember.room_id == room_id)
+    return {user_id: name for user_id, name in rows}
+
+def load_active_round_id(room_id):
+    """Active round id of a room from the database"""
+    return db.session.query(Round.id).filter_by(room_id=room_id, status='active').limit(1).scalar()
+
+def get_room_info(room_id):
+    """Cached {id, code, name} for a room, or None if it does not exist"""
+    return room_cache.get_or_load(room_id, load_room)
+
+def get_round_info(round_id):
+    """Cached {id, room_id, status} for a round, or None if it does not exist"""
+    return round_cache.get_or_load(round_id, load_round)
+
+def get_room_members(room_id):
+    """Cached {user_id: user_name} of a room's members"""
+    return member_cache.get_or_load(room_id, load_members)
+
+def get_member_name(room_id, user_id):
+    """Name of a room member, or None if the user is not in the room.
+
+    A miss reloads the member set once, so a user who just joined through
+    another worker is not turned away until the entry expires.
+    """
+    members = get_room_members(room_id)
+    if user_id not in members:
+        members = load_members(room_id)
+        member_cache.set(room_id, members)
+    return members.get(user_id)
+
+def get_active_round_id(room_id):
+    """Cached id of a room's active round, or None"""
+    return active_round_cache.get_or_load(room_id, load_active_round_id)
+
+def stale_entries(obj):
+    """(cache, key) pairs invalidated by a change to an ORM object"""
+    if isinstance(obj, Room):
+        return [(room_cache, obj.id), (member_cache, obj.id)]
+    if isinstance(obj, RoomMember):
+        return [(member_cache, obj.room_id)]
+    if isinstance(obj, Round):
+        return [(round_cache, obj.id), (active_round_cache, obj.room_id)]
+    return []
+
+@event.listens_for(Session, 'after_flush')
+def collect_stale_entries(session, flush_context):
+    """Remember which cache entries the flushed changes make stale"""
+    stale = session.info.setdefault('stale_cache_entries', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and db.inspect(obj).attrs.name.history.deleted:
+            # Member names are cached per room; renames are rare enough to clear all
+            stale.add((member_cache, None))
+        stale.update(stale_entries(obj))
+
+@event.listens_for(Session, 'after_commit')
+def invalidate_stale_entries(session):
+    """Drop cache entries whose rows changed in the committed transaction"""
+    for cache, key in session.info.pop('stale_cache_entries', ()):
+        if key is None:
+            cache.clear()
+        else:
+            cache.pop(key)
+
+@event.listens_for(Session, 'after_rollback')
+def discard_stale_entries(session):
+    """Nothing was written; keep the cache as it is"""
+    session.info.pop('stale_cache_entries', None)
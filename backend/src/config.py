@@ -0,0 +1,138 @@
+import os
+import sqlite3
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_DATABASE_URI = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+
+def env_int(name, default):
+    """Read an integer setting from the environment"""
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+def env_flag(name, default=False):
+    """Read a boolean setting (1/true/yes/on) from the environment"""
+    value = os.environ.get(name)
+    if value in (None, ''):
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+# SQLite connection pragmas, applied to every new connection. WAL lets readers
+# proceed while a writer commits; NORMAL sync is durable in WAL mode except on
+# power loss; busy_timeout makes writers wait for the lock instead of failing.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': env_int('SQLITE_BUSY_TIMEOUT_MS', 5000),
+    'cache_size': -env_int('SQLITE_CACHE_SIZE_KB', 20000),  # negative = KiB
+    'mmap_size': env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+    'temp_store': 'MEMORY',
+}
+
+@event.listens_for(Engine, 'connect')
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune every SQLite connection; other databases are left untouched"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for pragma, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f'PRAGMA {pragma}={value}')
+    cursor.close()
+
+def is_memory_database(uri):
+    """True for in-memory SQLite URLs, which cannot use a sized pool"""
+    return uri in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in uri
+
+def database_engine_options(uri):
+    """SQLAlchemy engine options (pool sizing) for a database URL"""
+    if is_memory_database(uri):
+        return {}
+
+    return {
+        'pool_size': env_int('DB_POOL_SIZE', 10),
+        'max_overflow': env_int('DB_MAX_OVERFLOW', 20),
+        'pool_timeout': env_int('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': not uri.startswith('sqlite'),
+    }
+
+def configure_database(app):
+    """Set the database URL and engine options on a Flask app.
+
+    DATABASE_URL selects another backend (e.g. postgresql://...); the
+    default is the bundled SQLite file.
+    """
+    uri = os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URI)
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = database_engine_options(uri)
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Leaderboard pushes are coalesced per round into one diff per window
+LEADERBOARD_PUSH_WINDOW_MS = env_int('LEADERBOARD_PUSH_WINDOW_MS', 250)
+
+# Active rounds are reloaded into the deadline scheduler this often, to pick
+# up rounds created by other workers (see src/round_scheduler.py)
+ROUND_SCHEDULER_REFRESH_SECONDS = env_int('ROUND_SCHEDULER_REFRESH_SECONDS', 60)
+
+# Read-through caches for room, membership and round lookups (see src/cache.py)
+CACHE_TTL_SECONDS = env_int('CACHE_TTL_SECONDS', 30)
+CACHE_MAX_ENTRIES = env_int('CACHE_MAX_ENTRIES', 4096)
+
+# Request, SQL and Socket.IO instrumentation served on /api/metrics (see src/metrics.py)
+METRICS_ENABLED = env_flag('METRICS_ENABLED')
+
+# Room codes are a keyed permutation of a sequence (see src/room_codes.py).
+# The key is generated at random and stored in the database; ROOM_CODE_KEY
+# overrides it, e.g. to share one key between databases. Changing the key on
+# a live database can reissue codes already in use. Each worker reserves
+# ROOM_CODE_BLOCK_SIZE sequence values per database round-trip.
+ROOM_CODE_KEY = os.environ.get('ROOM_CODE_KEY') or None
+ROOM_CODE_BLOCK_SIZE = env_int('ROOM_CODE_BLOCK_SIZE', 100)
+
+# Largest item list accepted by the batch task endpoints
+MAX_BATCH_ITEMS = env_int('MAX_BATCH_ITEMS', 200)
+
+# JSON encoder for API responses: auto (orjson if installed), orjson or stdlib
+JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto')
+
+# Proof uploads
+UPLOAD_DIR = os.environ.get('UPLOAD_DIR', os.path.join(os.path.dirname(__file__), 'static', 'uploads'))
+PROOF_MAX_BYTES = env_int('PROOF_MAX_BYTES', 10 * 1024 * 1024)
+UPLOAD_CHUNK_SIZE = env_int('UPLOAD_CHUNK_SIZE', 64 * 1024)
+# Resumable and temporary upload files untouched this long are deleted
+UPLOAD_PARTIAL_MAX_AGE_SECONDS = env_int('UPLOAD_PARTIAL_MAX_AGE_SECONDS', 24 * 60 * 60)
+UPLOAD_SWEEP_INTERVAL_SECONDS = env_int('UPLOAD_SWEEP_INTERVAL_SECONDS', 60 * 60)
+# Hard cap on any request body; leaves room for base64 overhead on legacy JSON uploads
+MAX_REQUEST_BYTES = env_int('MAX_REQUEST_BYTES', PROOF_MAX_BYTES * 4 // 3 + 64 * 1024)
+
+# Proof image variants, rendered off-request (requires Pillow)
+THUMBNAIL_WORKERS = env_int('THUMBNAIL_WORKERS', 2)
+THUMBNAIL_MAX_PX = env_int('THUMBNAIL_MAX_PX', 320)
+DISPLAY_MAX_PX = env_int('DISPLAY_MAX_PX', 1280)
+THUMBNAIL_QUALITY = env_int('THUMBNAIL_QUALITY', 70)
+DISPLAY_QUALITY = env_int('DISPLAY_QUALITY', 82)
+
+# Multi-worker Socket.IO: presence backend (memory or database) and the
+# message queue relaying emits between workers (redis://, amqp://, or
+# sqlite:////path/queue.db for a single host without a broker)
+PRESENCE_BACKEND = os.environ.get('PRESENCE_BACKEND', 'memory')
+# Database presence: each worker refreshes its sessions every heartbeat;
+# sessions not refreshed within the TTL (a crashed worker) are dropped
+PRESENCE_HEARTBEAT_SECONDS = env_int('PRESENCE_HEARTBEAT_SECONDS', 30)
+PRESENCE_TTL_SECONDS = env_int('PRESENCE_TTL_SECONDS', 90)
+SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE') or None
+
+# Server. SERVER_MODE (threading or gevent) lives in src/server.py, which must
+# be imported before anything else. gevent needs PostgreSQL with psycogreen
+# and refuses to start on SQLite. Debug and per-packet Socket.IO logging are
+# off unless asked for. Outside a terminal, threading mode only starts the
+# Werkzeug development server in debug mode or with ALLOW_UNSAFE_WERKZEUG.
+SERVER_HOST = os.environ.get('SERVER_HOST', '0.0.0.0')
+SERVER_PORT = env_int('SERVER_PORT', 5001)
+DEBUG = env_flag('DEBUG')
+ALLOW_UNSAFE_WERKZEUG = env_flag('ALLOW_UNSAFE_WERKZEUG')
+SOCKETIO_LOGGING = env_flag('SOCKETIO_LOGGING')
+# Idle sockets only cost a ping every interval; a longer interval means fewer
+# wakeups per idle connection
+SOCKETIO_PING_INTERVAL = env_int('SOCKETIO_PING_INTERVAL', 25)
+SOCKETIO_PING_TIMEOUT = env_int('SOCKETIO_PING_TIMEOUT', 20)
@@ -0,0 +1,97 @@
+from flask import current_app
+
+# Domain events published by the REST routes after a successful commit.
+# Payloads are compact deltas (ids and changed fields, not full objects);
+# clients re-fetch anything else they need.
+
+def publish(room_id, event, payload):
+    """Broadcast a domain event to every client in a room"""
+    socketio = current_app.extensions.get('socketio')
+    if not socketio or not room_id:
+        return
+    
+    # The change is already committed; a failed broadcast must not fail the request
+    try:
+        socketio.emit(event, payload, to=room_id)
+    except Exception as e:
+        print(f'Error publishing {event}: {str(e)}')
+
+def round_started(round_obj):
+    """Announce a newly created round"""
+    publish(round_obj.room_id, 'round_started', {
+        'round': round_obj.to_dict(),
+        'message': 'A new round has started!'
+    })
+
+def round_ended(round_obj, final_stats):
+    """Announce a completed round with its final standings"""
+    publish(round_obj.room_id, 'round_ended', {
+        'round': round_obj.to_dict(),
+        'final_stats': final_stats,
+        'message': 'Round has ended!'
+    })
+
+def task_created(task, room_id, creator_name):
+    """Announce a new task"""
+    publish(room_id, 'task_created', {
+        'task_id': task.id,
+        'round_id': task.round_id,
+        'creator_id': task.creator_id,
+        'creator_name': creator_name,
+        'title': task.title,
+        'template': task.template,
+        'points': task.points,
+        'message': f"New task created: {task.title}"
+    })
+
+def task_completed(task, room_id):
+    """Announce that proof was uploaded for a task"""
+    publish(room_id, 'task_completed', {
+        'task_id': task.id,
+        'round_id': task.round_id,
+        'creator_id': task.creator_id,
+        'proof_type': task.proof_type,
+        'proof_url': task.proof_url,
+        'message': f"Task completed: {task.title}"
+    })
+
+def proof_variants_ready(task_id, room_id, thumbnail_url, display_url):
+    """Announce that downscaled proof images are available for a task"""
+    publish(room_id, 'proof_variants_ready', {
+        'task_id': task_id,
+        'proof_thumbnail_url': thumbnail_url,
+        'proof_display_url': display_url
+    })
+
+def task_approved(task, room_id, approver_id, approver_name):
+    """Announce an approval decision on a task"""
+    status = 'approved' if task.approved else 'rejected'
+    publish(room_id, 'task_approved', {
+        'task_id': task.id,
+        'round_id': task.round_id,
+        'approved': task.approved,
+        'approver_id': approver_id,
+        'approver_name': approver_name,
+        'message': f"Task {status} by {approver_name}: {task.title}"
+    })
+
+def task_flagged(task, room_id, flagger_id, flagger_name):
+    """Announce that a task was flagged for review"""
+    publish(room_id, 'task_flagged', {
+        'task_id': task.id,
+        'round_id': task.round_id,
+        'flagged_count': task.flagged_count,
+        'flagger_id': flagger_id,
+        'flagger_name': flagger_name,
+        'message': f"Task flagged by {flagger_name}: {task.title}"
+    })
+
+def flag_vote_cast(task, room_id, voter_id):
+    """Announce a flag vote and the resulting task state"""
+    publish(room_id, 'flag_vote_cast', {
+        'task_id': task.id,
+        'round_id': task.round_id,
+        'voter_id': voter_id,
+        'approved': task.approved,
+        'points': task.points
+    })
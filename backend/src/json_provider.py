@@ -0,0 +1,60 @@
+import dataclasses
+from datetime import date
+import decimal
+import uuid
+from flask.json.provider import DefaultJSONProvider
+from src.config import JSON_BACKEND
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; responses fall back to the stdlib encoder
+    orjson = None
+
+def encode_default(o):
+    """Encode types the JSON encoders don't handle natively; dates become ISO 8601"""
+    if isinstance(o, date):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes responses with orjson when available.
+
+    JSON_BACKEND picks the encoder: auto (orjson if installed), orjson or
+    stdlib. Both encoders write datetimes as ISO 8601, so the row serializers
+    in src/serializers.py can hand over datetime values untouched.
+    """
+    default = staticmethod(encode_default)
+
+    def __init__(self, app, backend=JSON_BACKEND):
+        super().__init__(app)
+        if backend == 'orjson' and orjson is None:
+            print('orjson not installed, falling back to stdlib json')
+        self.use_orjson = backend in ('auto', 'orjson') and orjson is not None
+
+    def encode(self, obj, pretty=False):
+        """Encode an object to JSON bytes with orjson"""
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        if self.use_orjson and not kwargs:
+            return self.encode(obj).decode()
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if not self.use_orjson:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.encode(obj, pretty) + b'\n', mimetype=self.mimetype)
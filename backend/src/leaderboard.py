@@ -0,0 +1,327 @@
+from datetime import datetime
+from sqlalchemy import event, func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+import threading
+from src.models.user import db, User, Round, Task, RoundScore, RoundResult, RoomStanding
+from src.server import in_app_context
+from src.versions import get_versions, touch
+
+def task_score(task):
+    """Return the (points, task_count) a task contributes to its round leaderboard"""
+    if task.approved is not True:
+        return 0.0, 0
+    multiplier = task.difficulty_multiplier if task.difficulty_multiplier is not None else 1.0
+    return (task.points or 0) * multiplier, 1
+
+def apply_task_score(task, previous=(0.0, 0)):
+    """Apply the change in a task's contribution since `previous` to its creator's RoundScore.
+
+    Callers snapshot `task_score(task)` before mutating the task and pass it in
+    as `previous`; the row is updated with a single atomic increment.
+    """
+    apply_task_scores([(task, previous)])
+
+def apply_task_scores(changes):
+    """Apply a batch of (task, previous) score changes with one increment per creator"""
+    deltas = {}
+    for task, previous in changes:
+        points, count = task_score(task)
+        key = (task.round_id, task.creator_id)
+        total_points, task_count = deltas.get(key, (0.0, 0))
+        deltas[key] = (total_points + points - previous[0], task_count + count - previous[1])
+
+    for (round_id, user_id), (points_delta, count_delta) in deltas.items():
+        if points_delta or count_delta:
+            add_to_round_score(round_id, user_id, points_delta, count_delta)
+
+def upsert_increments(model, key, increments):
+    """Insert a row, or add `increments` to its counters if `key` already exists.
+
+    A single INSERT ... ON CONFLICT DO UPDATE, so concurrent first writes for
+    the same key cannot both insert and trip the unique constraint.
+    """
+    insert = postgresql_insert if db.session.get_bind().dialect.name == 'postgresql' else sqlite_insert
+    statement = insert(model).values(**key, **increments)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(key),
+        set_={name: getattr(model, name) + statement.excluded[name] for name in increments}
+    )
+    db.session.execute(statement)
+
+def add_to_round_score(round_id, user_id, points_delta, count_delta):
+    """Atomically increment a user's RoundScore, creating the row if needed"""
+    # Picked up by the after_commit hook below to schedule a leaderboard push
+    db.session.info.setdefault('dirty_rounds', set()).add(round_id)
+
+    upsert_increments(
+        RoundScore,
+        {'round_id': round_id, 'user_id': user_id},
+        {'total_points': points_delta, 'task_count': count_delta}
+    )
+
+def touch_task_versions(task):
+    """Bump the task list and stats versions of a task's round after a bulk UPDATE.
+
+    Bulk UPDATEs skip the flush hooks that bump them for ORM writes.
+    """
+    touch(f'round:{task.round_id}:tasks', f'round:{task.round_id}:stats')
+
+def update_task_approval(task, approved, attempts=3):
+    """Set a task's approval with an optimistic check against concurrent reviews.
+
+    The UPDATE only matches while the row still has the approval state the
+    score snapshot was taken from; if another review got there first, the
+    state is reloaded and the update retried. Returns the (points,
+    task_count) the task contributed before, for apply_task_score, or None
+    if the task kept changing.
+    """
+    for _ in range(attempts):
+        previous = task_score(task)
+        if task.approved is None:
+            unchanged = Task.approved.is_(None)
+        else:
+            unchanged = Task.approved == task.approved
+        updated = Task.query.filter(Task.id == task.id, unchanged).update(
+            {Task.approved: approved}, synchronize_session=False
+        )
+        if updated:
+            set_committed_value(task, 'approved', approved)
+            touch_task_versions(task)
+            return previous
+        db.session.refresh(task, ['approved'])
+    return None
+
+def revoke_task_points(task):
+    """Reject an approved task and take its points back, at most once.
+
+    The conditional UPDATE only matches while the task is still approved, so
+    when concurrent requests race to revoke the same task exactly one of
+    them changes the row and its creator's score. Returns True for that one.
+    """
+    revoked = Task.query.filter_by(id=task.id, approved=True).update(
+        {Task.approved: False, Task.points: 0}, synchronize_session=False
+    )
+    if not revoked:
+        return False
+
+    # points and difficulty_multiplier only change here, so the loaded values are current
+    multiplier = task.difficulty_multiplier if task.difficulty_multiplier is not None else 1.0
+    add_to_round_score(task.round_id, task.creator_id, -(task.points or 0) * multiplier, -1)
+    touch_task_versions(task)
+    db.session.expire(task, ['approved', 'points'])
+    return True
+
+def rebuild_round_scores(round_id=None):
+    """Recompute RoundScore rows from approved tasks (all rounds, or just one)"""
+    scores = RoundScore.query
+    tasks = db.session.query(
+        Task.round_id,
+        Task.creator_id,
+        func.sum(Task.points * func.coalesce(Task.difficulty_multiplier, 1.0)),
+        func.count(Task.id)
+    ).filter(Task.approved == True)
+
+    if round_id:
+        scores = scores.filter_by(round_id=round_id)
+        tasks = tasks.filter(Task.round_id == round_id)
+
+    scores.delete()
+    for task_round_id, creator_id, total_points, task_count in tasks.group_by(Task.round_id, Task.creator_id):
+        db.session.add(RoundScore(
+            round_id=task_round_id,
+            user_id=creator_id,
+            total_points=total_points or 0.0,
+            task_count=task_count
+        ))
+
+def record_round_results(round_id, room_id, stats):
+    """Write a closed round's final placings and fold them into the room standings.
+
+    `stats` is the round's final get_round_stats_data(); result rows are
+    inserted once per round and each standing is upserted with an atomic
+    increment.
+    """
+    for entry in stats['leaderboard']:
+        rank = entry['rank']
+        db.session.add(RoundResult(
+            round_id=round_id,
+            user_id=entry['user_id'],
+            rank=rank,
+            total_points=entry['total_points'],
+            task_count=entry['task_count']
+        ))
+
+        upsert_increments(
+            RoomStanding,
+            {'room_id': room_id, 'user_id': entry['user_id']},
+            {
+                'total_points': entry['total_points'],
+                'task_count': entry['task_count'],
+                'rounds_played': 1,
+                'rounds_won': 1 if rank == 1 else 0,
+                'podiums': 1 if rank <= 3 else 0
+            }
+        )
+
+def assign_ranks(entries, keys=('total_points',)):
+    """Set competition ranks (1, 1, 3, ...) on entries already sorted best first.
+
+    Entries equal on every field in `keys` share a rank, so a tie for first
+    gives two winners rather than one picked by row order.
+    """
+    previous = None
+    for i, entry in enumerate(entries):
+        values = tuple(entry[key] for key in keys)
+        entry['rank'] = entries[i - 1]['rank'] if values == previous else i + 1
+        previous = values
+    return entries
+
+def get_round_stats_data(round_id):
+    """Helper function to build round statistics from the materialized leaderboard"""
+    scores = db.session.query(RoundScore, User.name, User.avatar).join(
+        User, RoundScore.user_id == User.id
+    ).filter(
+        RoundScore.round_id == round_id,
+        RoundScore.task_count > 0
+    ).order_by(
+        RoundScore.total_points.desc(), RoundScore.task_count.desc(), RoundScore.user_id.asc()
+    ).all()
+    
+    # Create leaderboard with rankings
+    leaderboard = []
+    for score, user_name, user_avatar in scores:
+        leaderboard.append({
+            'user_id': score.user_id,
+            'user_name': user_name,
+            'user_avatar': user_avatar,
+            'total_points': score.total_points,
+            'task_count': score.task_count
+        })
+    assign_ranks(leaderboard)
+    
+    return {
+        'leaderboard': leaderboard,
+        'total_tasks': sum(entry['task_count'] for entry in leaderboard),
+        'total_points_awarded': sum(entry['total_points'] for entry in leaderboard)
+    }
+
+class LeaderboardPublisher:
+    """Pushes coalesced leaderboard diffs to rooms.
+
+    Score changes mark a round dirty; a background task wakes once per
+    window, recomputes each dirty round's standings and emits a single
+    leaderboard_updated event carrying only the entries whose rank, points
+    or task count changed since the previous push.
+
+    Snapshots are per process, so with several workers a diff may be taken
+    against standings older than what another worker already pushed. Each
+    diff therefore carries the round's shared stats version it was computed
+    at (`version`) and the version of the snapshot it was diffed against
+    (`base_version`); a client whose last applied version is not
+    `base_version` has missed a change and re-fetches /stats.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.socketio = None
+        self.window = 0.25
+        self.lock = threading.Lock()
+        self.dirty = set()      # round_ids changed since the last push
+        self.snapshots = {}     # round_id -> (version, {user_id: entry}) as last pushed
+
+    def init_app(self, app, socketio, window_ms=250):
+        """Start the push loop for an app"""
+        self.app = app
+        self.socketio = socketio
+        self.window = window_ms / 1000.0
+        socketio.start_background_task(self.run)
+
+    def mark_dirty(self, round_id):
+        """Schedule a push for a round in the next window"""
+        if self.socketio is None:
+            return
+        with self.lock:
+            self.dirty.add(round_id)
+
+    def forget(self, round_id):
+        """Drop state for a round that will not change any more"""
+        with self.lock:
+            self.dirty.discard(round_id)
+            self.snapshots.pop(round_id, None)
+
+    def run(self):
+        """Background loop: flush dirty rounds once per window"""
+        while True:
+            self.socketio.sleep(self.window)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f'Error in leaderboard publisher: {str(e)}')
+
+    def flush(self):
+        """Push a diff for every round marked dirty since the last flush"""
+        with self.lock:
+            rounds, self.dirty = self.dirty, set()
+        if not rounds:
+            return
+
+        for room_id, payload in in_app_context(self.app, self.collect, rounds):
+            self.socketio.emit('leaderboard_updated', payload, to=room_id)
+
+    def collect(self, rounds):
+        """Diffs for a set of dirty rounds, as (room_id, payload) pairs"""
+        updates = []
+        for round_id in rounds:
+            update = self.diff(round_id)
+            if update:
+                updates.append(update)
+        return updates
+
+    def diff(self, round_id):
+        """The changes in a round's standings since its last push, or None"""
+        room_id = db.session.query(Round.room_id).filter(Round.id == round_id).scalar()
+        if not room_id:
+            self.forget(round_id)
+            return None
+
+        # Read the version before the standings, so they are at least this new
+        version, = get_versions([f'round:{round_id}:stats'])
+        stats = get_round_stats_data(round_id)
+        current = {entry['user_id']: entry for entry in stats['leaderboard']}
+        with self.lock:
+            base_version, previous = self.snapshots.get(round_id, (0, {}))
+            self.snapshots[round_id] = (version, current)
+
+        changes = [entry for user_id, entry in current.items() if previous.get(user_id) != entry]
+        removed = [user_id for user_id in previous if user_id not in current]
+        # Scores did change; an empty diff still moves clients to the new
+        # version, or shows them a gap if another worker pushed in between
+        if not changes and not removed and version == base_version:
+            return None
+
+        return room_id, {
+            'round_id': round_id,
+            'version': version,
+            'base_version': base_version,
+            'changes': changes,
+            'removed': removed,
+            'total_tasks': stats['total_tasks'],
+            'total_points_awarded': stats['total_points_awarded'],
+            'timestamp': datetime.utcnow().isoformat()
+        }
+
+leaderboard_publisher = LeaderboardPublisher()
+
+@event.listens_for(Session, 'after_commit')
+def publish_dirty_rounds(session):
+    """Mark rounds whose scores changed in the committed transaction"""
+    for round_id in session.info.pop('dirty_rounds', ()):
+        leaderboard_publisher.mark_dirty(round_id)
+
+@event.listens_for(Session, 'after_rollback')
+def discard_dirty_rounds(session):
+    """Forget score changes that were rolled back"""
+    session.info.pop('dirty_rounds', None)
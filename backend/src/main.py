@@ -3,6 +3,12 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+# Cooperative servers patch the standard library before anything else loads
+from src.server import SERVER_MODE, patch_stdlib, check_database
+patch_stdlib(SERVER_MODE)
+
+import atexit
+import signal
 from flask import Flask, send_from_directory
 from flask_cors import CORS
 from flask_socketio import SocketIO
@@ -11,33 +17,80 @@ from src.routes.user import user_bp
 from src.routes.rooms import rooms_bp
 from src.routes.rounds import rounds_bp
 from src.routes.tasks import tasks_bp
+from src.routes.proofs import proofs_bp
 from src.socketio_events import register_socketio_events
+from src.migrations import upgrade_database
+from src.config import (
+    configure_database, LEADERBOARD_PUSH_WINDOW_MS, MAX_REQUEST_BYTES, THUMBNAIL_WORKERS,
+    PRESENCE_BACKEND, SOCKETIO_MESSAGE_QUEUE, SERVER_HOST, SERVER_PORT, DEBUG, SOCKETIO_LOGGING,
+    ALLOW_UNSAFE_WERKZEUG, SOCKETIO_PING_INTERVAL, SOCKETIO_PING_TIMEOUT, ROUND_SCHEDULER_REFRESH_SECONDS,
+    UPLOAD_PARTIAL_MAX_AGE_SECONDS, UPLOAD_SWEEP_INTERVAL_SECONDS,
+    PRESENCE_HEARTBEAT_SECONDS, PRESENCE_TTL_SECONDS
+)
+from src.presence import create_presence_store
+from src.message_queue import socketio_queue_options
+from src.leaderboard import leaderboard_publisher
+from src.round_scheduler import round_scheduler
+from src.thumbnails import thumbnail_pipeline
+from src.uploads import start_upload_sweeper
+from src.json_provider import FastJSONProvider
+from src.metrics import metrics
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+app.json = FastJSONProvider(app)
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_BYTES
 
 # Enable CORS for all routes
 CORS(app, origins="*")
 
-# Initialize SocketIO with CORS support
-socketio = SocketIO(app, cors_allowed_origins="*", logger=True, engineio_logger=True)
+# Initialize SocketIO with CORS support; a message queue relays emits between workers.
+# Sockets don't use the Flask session, so skip copying it into every connection.
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=SERVER_MODE,
+                    logger=SOCKETIO_LOGGING, engineio_logger=SOCKETIO_LOGGING,
+                    manage_session=False, ping_interval=SOCKETIO_PING_INTERVAL,
+                    ping_timeout=SOCKETIO_PING_TIMEOUT,
+                    **socketio_queue_options(SOCKETIO_MESSAGE_QUEUE))
 
 # Register blueprints
 app.register_blueprint(user_bp, url_prefix='/api')
 app.register_blueprint(rooms_bp, url_prefix='/api')
 app.register_blueprint(rounds_bp, url_prefix='/api')
 app.register_blueprint(tasks_bp, url_prefix='/api')
+app.register_blueprint(proofs_bp, url_prefix='/api')
 
 # Database configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+configure_database(app)
+check_database(SERVER_MODE, app.config['SQLALCHEMY_DATABASE_URI'])
 db.init_app(app)
 
 with app.app_context():
-    db.create_all()
+    upgrade_database()
 
 # Register Socket.io events
-register_socketio_events(socketio)
+presence = create_presence_store(PRESENCE_BACKEND)
+register_socketio_events(socketio, presence)
+presence.init_app(app, socketio, PRESENCE_HEARTBEAT_SECONDS, PRESENCE_TTL_SECONDS)
+leaderboard_publisher.init_app(app, socketio, LEADERBOARD_PUSH_WINDOW_MS)
+round_scheduler.init_app(app, socketio, ROUND_SCHEDULER_REFRESH_SECONDS)
+thumbnail_pipeline.init_app(app, THUMBNAIL_WORKERS)
+metrics.init_app(app, socketio)
+start_upload_sweeper(socketio, UPLOAD_PARTIAL_MAX_AGE_SECONDS, UPLOAD_SWEEP_INTERVAL_SECONDS)
+
+def shutdown():
+    """Release this worker's shared state before the process exits"""
+    thumbnail_pipeline.shutdown()
+    try:
+        with app.app_context():
+            presence.clear_host()
+    except Exception as e:
+        print(f'Error clearing presence on shutdown: {str(e)}')
+
+atexit.register(shutdown)
+
+def handle_sigterm(signum, frame):
+    """Stop serving on SIGTERM so shutdown() runs"""
+    raise SystemExit(0)
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
@@ -59,6 +112,14 @@ def serve(path):
 def health_check():
     return {'status': 'healthy', 'message': 'Productivity Leaderboard API is running'}
 
+@app.route('/api/metrics')
+def metrics_endpoint():
+    if not metrics.enabled:
+        return {'status': 'disabled', 'message': 'Set METRICS_ENABLED=1 to collect metrics'}, 404
+    return metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
 if __name__ == '__main__':
-    socketio.run(app, host='0.0.0.0', port=5001, debug=True)
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    socketio.run(app, host=SERVER_HOST, port=SERVER_PORT, debug=DEBUG,
+                 log_output=SOCKETIO_LOGGING, allow_unsafe_werkzeug=DEBUG or ALLOW_UNSAFE_WERKZEUG)
 
@@ -0,0 +1,73 @@
+import os
+import sqlite3
+import time
+from socketio import PubSubManager
+
+class SqliteQueueManager(PubSubManager):
+    """Socket.IO client manager that relays emits through a SQLite file.
+
+    A local stand-in for Redis/AMQP: every worker on the same host appends
+    its emits to a shared table and polls it for messages from the others.
+    Selected with SOCKETIO_MESSAGE_QUEUE=sqlite:////path/to/queue.db.
+    """
+    name = 'sqlite'
+
+    # Messages older than this are pruned; every live worker has seen them
+    RETENTION_SECONDS = 60
+
+    def __init__(self, url, channel='socketio', write_only=False, logger=None,
+                 json=None, poll_interval=0.05):
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+        self.path = url[len('sqlite:///'):]
+        self.poll_interval = poll_interval
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS socketio_message ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                'channel TEXT NOT NULL, '
+                'payload TEXT NOT NULL, '
+                'created_at REAL NOT NULL)'
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _publish(self, data):
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT INTO socketio_message (channel, payload, created_at) VALUES (?, ?, ?)',
+                (self.channel, self.json.dumps(data), now)
+            )
+            connection.execute(
+                'DELETE FROM socketio_message WHERE created_at < ?',
+                (now - self.RETENTION_SECONDS,)
+            )
+
+    def _listen(self):
+        connection = self._connect()
+        last_id = connection.execute('SELECT COALESCE(MAX(id), 0) FROM socketio_message').fetchone()[0]
+        while True:
+            rows = connection.execute(
+                'SELECT id, payload FROM socketio_message WHERE channel = ? AND id > ? ORDER BY id',
+                (self.channel, last_id)
+            ).fetchall()
+            for message_id, payload in rows:
+                last_id = message_id
+                yield payload
+            if not rows:
+                self.server.sleep(self.poll_interval)
+
+def socketio_queue_options(url):
+    """SocketIO() keyword arguments for a SOCKETIO_MESSAGE_QUEUE url.
+
+    sqlite:/// urls use SqliteQueueManager; anything else (redis://, amqp://,
+    kafka://, zmq+tcp://) is handled by python-socketio itself.
+    """
+    if not url:
+        return {}
+    if url.startswith('sqlite:///'):
+        return {'client_manager': SqliteQueueManager(url)}
+    return {'message_queue': url}
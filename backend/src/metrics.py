@@ -0,0 +1,212 @@
+import functools
+import inspect
+import threading
+import time
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.config import METRICS_ENABLED
+
+# In-process instrumentation exposed in the Prometheus text format on
+# /api/metrics. Flask request hooks time every REST request, engine events
+# count the SQL statements and time spent per request, and Socket.IO handlers
+# and emits are timed and counted. Nothing is registered when METRICS_ENABLED
+# is off. Each worker reports its own counters; scrape every worker.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+def format_labels(names, values):
+    """Prometheus label set for a series"""
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class Counter:
+    """Monotonic counter with labels"""
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def inc(self, label_values=(), amount=1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            values = dict(self.values)
+        for label_values, value in sorted(values.items()):
+            yield f'{self.name}{format_labels(self.labels, label_values)} {value}'
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.series = {}    # label values -> [per-bucket counts..., +Inf count, sum]
+
+    def observe(self, value, label_values=()):
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def samples(self):
+        with self.lock:
+            snapshot = {labels: list(series) for labels, series in self.series.items()}
+        names = self.labels + ('le',)
+        for label_values, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series):
+                cumulative += count
+                yield f'{self.name}_bucket{format_labels(names, label_values + (bound,))} {cumulative}'
+            yield f'{self.name}_sum{format_labels(self.labels, label_values)} {series[-1]}'
+            yield f'{self.name}_count{format_labels(self.labels, label_values)} {cumulative}'
+
+class Metrics:
+    """Registry of the app's metrics plus the hooks that feed them"""
+
+    def __init__(self):
+        self.enabled = False
+        self.request_latency = Histogram(
+            'http_request_duration_seconds', 'REST request latency by endpoint',
+            ('endpoint', 'method'))
+        self.requests = Counter(
+            'http_requests_total', 'REST requests by endpoint and status',
+            ('endpoint', 'method', 'status'))
+        self.request_queries = Histogram(
+            'http_request_db_queries', 'SQL statements issued per REST request',
+            ('endpoint',), QUERY_COUNT_BUCKETS)
+        self.query_time = Counter(
+            'db_query_seconds_total', 'Time spent executing SQL, by endpoint or socket event',
+            ('scope',))
+        self.queries = Counter(
+            'db_queries_total', 'SQL statements executed, by endpoint or socket event',
+            ('scope',))
+        self.handler_latency = Histogram(
+            'socketio_handler_duration_seconds', 'Socket.IO event handler latency',
+            ('event',))
+        self.handler_errors = Counter(
+            'socketio_handler_errors_total', 'Socket.IO event handlers that raised',
+            ('event',))
+        self.emits = Counter(
+            'socketio_emits_total', 'Socket.IO events emitted by this worker',
+            ('event',))
+        self.registry = (
+            self.request_latency, self.requests, self.request_queries, self.queries,
+            self.query_time, self.handler_latency, self.handler_errors, self.emits
+        )
+
+    def init_app(self, app, socketio=None):
+        """Install request, SQL and Socket.IO hooks (no-op unless METRICS_ENABLED)"""
+        if not METRICS_ENABLED:
+            return
+        self.enabled = True
+        app.before_request(self.start_request)
+        app.after_request(self.record_status)
+        app.teardown_request(self.finish_request)
+        event.listen(Engine, 'before_cursor_execute', self.start_query)
+        event.listen(Engine, 'after_cursor_execute', self.finish_query)
+        if socketio is not None:
+            socketio.emit = self.counted_emit(socketio.emit)
+
+    # REST requests
+
+    def start_request(self):
+        g.metrics_scope = request.endpoint or 'unmatched'
+        g.metrics_queries = 0
+        g.metrics_started = time.perf_counter()
+
+    def record_status(self, response):
+        g.metrics_status = response.status_code
+        return response
+
+    def finish_request(self, exc):
+        # Socket.IO handlers run in a request context too, without before_request
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        endpoint = g.metrics_scope
+        self.request_latency.observe(elapsed, (endpoint, request.method))
+        self.requests.inc((endpoint, request.method, g.pop('metrics_status', 500)))
+        self.request_queries.observe(g.metrics_queries, (endpoint,))
+
+    # SQL
+
+    def start_query(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_query_started', []).append(time.perf_counter())
+
+    def finish_query(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['metrics_query_started'].pop()
+        scope = 'background'
+        if has_app_context() and 'metrics_scope' in g:
+            scope = g.metrics_scope
+            g.metrics_queries = g.get('metrics_queries', 0) + 1
+        self.queries.inc((scope,))
+        self.query_time.inc((scope,), elapsed)
+
+    # Socket.IO
+
+    def timed_event(self, name):
+        """Decorator timing a Socket.IO handler (returns it unchanged when disabled)"""
+        def decorator(handler):
+            if not METRICS_ENABLED:
+                return handler
+
+            signature = inspect.signature(handler)
+
+            @functools.wraps(handler)
+            def wrapper(*args, **kwargs):
+                # Flask-SocketIO retries connect/disconnect handlers with fewer
+                # arguments on TypeError, so reject a mismatch before timing
+                signature.bind(*args, **kwargs)
+                g.metrics_scope = f'socketio:{name}'
+                started = time.perf_counter()
+                try:
+                    return handler(*args, **kwargs)
+                except Exception:
+                    self.handler_errors.inc((name,))
+                    raise
+                finally:
+                    self.handler_latency.observe(time.perf_counter() - started, (name,))
+            return wrapper
+        return decorator
+
+    def counted_emit(self, emit):
+        """Wrap SocketIO.emit to count emitted events"""
+        @functools.wraps(emit)
+        def wrapper(event_name, *args, **kwargs):
+            self.emits.inc((event_name,))
+            return emit(event_name, *args, **kwargs)
+        return wrapper
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.registry:
+            lines.append(f'# HELP {metric.name} {metric.help_text}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics()
@@ -0,0 +1,207 @@
+from datetime import datetime
+import json
+from sqlalchemy import inspect, text
+from src.models.user import db, Room, RoomMember, Round, Task, Vote, RoundScore, RoundResult, RoomStanding
+from src.leaderboard import rebuild_round_scores, get_round_stats_data, record_round_results
+from src.presence import PresenceSession
+from src.versions import ResourceVersion
+from src.room_codes import CodeSequence, room_codes
+from src.round_scheduler import close_round
+
+class SchemaMigration(db.Model):
+    """One row per migration applied to this database"""
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(100), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<SchemaMigration {self.version} {self.name}>'
+
+# Idempotent schema helpers, so a migration can run against databases where
+# db.create_all() already produced part of the current schema.
+
+def create_table(model):
+    """Create the table for a model if it does not exist yet"""
+    model.__table__.create(db.engine, checkfirst=True)
+
+def add_column(model, column_name):
+    """Add a column declared on a model to an existing table if it is missing"""
+    table = model.__table__
+    existing = {column['name'] for column in inspect(db.engine).get_columns(table.name)}
+    if column_name in existing:
+        return
+
+    column = table.c[column_name]
+    column_type = column.type.compile(dialect=db.engine.dialect)
+    ddl = f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+    if column.default is not None and column.default.is_scalar:
+        default = column.default.arg
+        ddl += f' DEFAULT {int(default) if isinstance(default, bool) else repr(default)}'
+
+    with db.engine.begin() as connection:
+        connection.execute(text(ddl))
+
+def create_indexes(model, *names):
+    """Create the named indexes declared on a model that do not exist yet.
+
+    Indexes are picked by name so a migration only builds what it introduced;
+    later indexes on the same model may depend on data fixes made by later
+    migrations.
+    """
+    indexes = {index.name: index for index in model.__table__.indexes}
+    for name in names:
+        indexes[name].create(db.engine, checkfirst=True)
+
+# Migrations
+
+def add_round_scores():
+    """Materialized per-round leaderboard"""
+    create_table(RoundScore)
+    rebuild_round_scores()
+    db.session.commit()
+
+def add_hot_path_indexes():
+    """Composite indexes for membership, active round, task and vote lookups"""
+    create_indexes(RoomMember, 'ix_room_member_room_user')
+    create_indexes(Round, 'ix_round_room_status')
+    create_indexes(Task, 'ix_task_round_approved', 'ix_task_round_flagged', 'ix_task_round_created')
+    create_indexes(Vote, 'ix_vote_task_type_voter', 'ix_vote_round_type')
+    create_indexes(RoundScore, 'ix_round_score_round_points')
+
+def add_proof_variant_urls():
+    """Thumbnail and display variant URLs for proof images"""
+    add_column(Task, 'proof_thumbnail_url')
+    add_column(Task, 'proof_display_url')
+
+def add_presence_sessions():
+    """Shared presence table for multi-worker deployments"""
+    create_table(PresenceSession)
+    create_indexes(PresenceSession, 'ix_presence_session_room', 'ix_presence_session_host')
+
+def add_room_member_count():
+    """Denormalized member counter on rooms, backfilled from room_member"""
+    add_column(Room, 'member_count')
+    db.session.execute(text(
+        'UPDATE room SET member_count = '
+        '(SELECT COUNT(*) FROM room_member WHERE room_member.room_id = room.id)'
+    ))
+    db.session.commit()
+
+def add_resource_versions():
+    """Change counters behind the ETags on polled GET endpoints"""
+    create_table(ResourceVersion)
+
+def add_round_final_stats():
+    """Final standings frozen at round close, backfilled for completed rounds"""
+    add_column(Round, 'final_stats')
+    for round_obj in Round.query.filter(Round.status == 'completed', Round.final_stats.is_(None)):
+        round_obj.final_stats = json.dumps(get_round_stats_data(round_obj.id))
+    db.session.commit()
+
+def add_round_results():
+    """Per-round result rows and room standings, backfilled from frozen final stats"""
+    create_table(RoundResult)
+    create_table(RoomStanding)
+    create_indexes(RoundResult, 'ix_round_result_round_rank')
+    create_indexes(RoomStanding, 'ix_room_standing_room_points')
+    completed = Round.query.filter(Round.status == 'completed', Round.final_stats.isnot(None))
+    for round_obj in completed.order_by(Round.created_at.asc()):
+        if not RoundResult.query.filter_by(round_id=round_obj.id).first():
+            record_round_results(round_obj.id, round_obj.room_id, json.loads(round_obj.final_stats))
+    db.session.commit()
+
+def add_flag_vote_tallies():
+    """Running flag vote tallies on tasks and one flag validation vote per user"""
+    add_column(Task, 'flag_votes')
+    add_column(Task, 'flag_votes_invalid')
+    # Keep each user's earliest vote where racing requests recorded two
+    db.session.execute(text(
+        "DELETE FROM vote WHERE vote_type = 'flag_validation' AND EXISTS ("
+        "SELECT 1 FROM vote AS earlier WHERE earlier.vote_type = 'flag_validation' "
+        "AND earlier.task_id = vote.task_id AND earlier.voter_id = vote.voter_id "
+        "AND (earlier.created_at < vote.created_at "
+        "OR (earlier.created_at = vote.created_at AND earlier.id < vote.id)))"
+    ))
+    db.session.execute(text(
+        "UPDATE task SET "
+        "flag_votes = (SELECT COUNT(*) FROM vote WHERE vote.task_id = task.id "
+        "AND vote.vote_type = 'flag_validation'), "
+        "flag_votes_invalid = (SELECT COUNT(*) FROM vote WHERE vote.task_id = task.id "
+        "AND vote.vote_type = 'flag_validation' AND NOT vote.vote)"
+    ))
+    db.session.commit()
+    create_indexes(Vote, 'uq_vote_flag_validation')
+
+def add_unique_flags():
+    """One recorded flag per user and task (flags were not recorded before)"""
+    create_indexes(Vote, 'uq_vote_flag')
+
+def add_room_code_sequence():
+    """Sequence behind the keyed room code allocator"""
+    create_table(CodeSequence)
+
+def add_presence_last_seen():
+    """Heartbeat timestamp on presence sessions, so dead workers' sessions expire"""
+    add_column(PresenceSession, 'last_seen')
+    create_indexes(PresenceSession, 'ix_presence_session_last_seen')
+    db.session.execute(text('UPDATE presence_session SET last_seen = connected_at WHERE last_seen IS NULL'))
+    db.session.commit()
+
+def add_room_code_secret():
+    """Random room code key stored with the sequence, replacing the built-in default"""
+    add_column(CodeSequence, 'secret')
+    room_codes.stored_secret()
+
+def add_unique_active_round():
+    """One active round per room, closing all but the newest where racing workers started two"""
+    duplicated = db.session.query(Round.room_id).filter(Round.status == 'active').group_by(
+        Round.room_id
+    ).having(db.func.count(Round.id) > 1)
+    for room_id, in duplicated.all():
+        active = Round.query.filter_by(room_id=room_id, status='active').order_by(
+            Round.created_at.desc(), Round.id.desc()
+        ).all()
+        for round_obj in active[1:]:
+            close_round(round_obj.id)
+    create_indexes(Round, 'uq_round_active_room')
+
+# Ordered list of (version, migration). Never renumber or remove entries;
+# append new ones with the next version number.
+MIGRATIONS = [
+    (1, add_round_scores),
+    (2, add_hot_path_indexes),
+    (3, add_proof_variant_urls),
+    (4, add_presence_sessions),
+    (5, add_room_member_count),
+    (6, add_resource_versions),
+    (7, add_round_final_stats),
+    (8, add_round_results),
+    (9, add_flag_vote_tallies),
+    (10, add_unique_flags),
+    (11, add_room_code_sequence),
+    (12, add_presence_last_seen),
+    (13, add_room_code_secret),
+    (14, add_unique_active_round),
+]
+
+def current_version():
+    """Highest migration version recorded in the database (0 if none)"""
+    return db.session.query(db.func.max(SchemaMigration.version)).scalar() or 0
+
+def upgrade_database():
+    """Bring the database schema up to date.
+
+    Missing tables are created from the models first, then every migration
+    newer than the recorded version runs in order. Existing databases are
+    upgraded in place.
+    """
+    db.create_all()
+
+    applied = current_version()
+    for version, migration in MIGRATIONS:
+        if version <= applied:
+            continue
+        print(f'Applying migration {version}: {migration.__name__}')
+        migration()
+        db.session.add(SchemaMigration(version=version, name=migration.__name__))
+        db.session.commit()
@@ -1,4 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, func, text
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.util import identity_key
 from datetime import datetime
 import uuid
 
@@ -14,6 +17,7 @@ class User(db.Model):
     room_memberships = db.relationship('RoomMember', back_populates='user', cascade='all, delete-orphan')
     tasks = db.relationship('Task', back_populates='creator', cascade='all, delete-orphan')
     votes = db.relationship('Vote', back_populates='voter', cascade='all, delete-orphan')
+    round_scores = db.relationship('RoundScore', back_populates='user', cascade='all, delete-orphan')
 
     def __repr__(self):
         return f'<User {self.name}>'
@@ -31,10 +35,12 @@ class Room(db.Model):
     code = db.Column(db.String(10), unique=True, nullable=False)
     name = db.Column(db.String(100), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    member_count = db.Column(db.Integer, default=0)  # kept in sync by the RoomMember insert/delete hooks below
     
     # Relationships
     members = db.relationship('RoomMember', back_populates='room', cascade='all, delete-orphan')
     rounds = db.relationship('Round', back_populates='room', cascade='all, delete-orphan')
+    standings = db.relationship('RoomStanding', back_populates='room', cascade='all, delete-orphan')
 
     def __repr__(self):
         return f'<Room {self.name} ({self.code})>'
@@ -45,10 +51,14 @@ class Room(db.Model):
             'code': self.code,
             'name': self.name,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'member_count': len(self.members)
+            'member_count': self.member_count or 0
         }
 
 class RoomMember(db.Model):
+    __table_args__ = (
+        db.Index('ix_room_member_room_user', 'room_id', 'user_id'),
+    )
+
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     room_id = db.Column(db.String(36), db.ForeignKey('room.id'), nullable=False)
     user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
@@ -72,19 +82,64 @@ class RoomMember(db.Model):
             'user': self.user.to_dict() if self.user else None
         }
 
+# Room.member_count is a denormalized counter. Every RoomMember insert/delete
+# bumps it with an atomic UPDATE in the same transaction, so concurrent joins
+# never lose a count and reading it never loads the members collection.
+
+def change_member_count(connection, member, delta):
+    """Atomically adjust a room's member_count and mark it for refresh"""
+    rooms = Room.__table__
+    connection.execute(
+        rooms.update()
+        .where(rooms.c.id == member.room_id)
+        .values(member_count=func.coalesce(rooms.c.member_count, 0) + delta)
+    )
+    session = object_session(member)
+    if session is not None:
+        session.info.setdefault('member_count_changed', set()).add(member.room_id)
+
+@event.listens_for(RoomMember, 'after_insert')
+def count_member_added(mapper, connection, member):
+    """Count a new member"""
+    change_member_count(connection, member, 1)
+
+@event.listens_for(RoomMember, 'after_delete')
+def count_member_removed(mapper, connection, member):
+    """Uncount a removed member"""
+    change_member_count(connection, member, -1)
+
+@event.listens_for(Session, 'after_flush_postexec')
+def refresh_member_counts(session, flush_context):
+    """Expire member_count on loaded rooms whose counter changed in this flush"""
+    for room_id in session.info.pop('member_count_changed', ()):
+        room = session.identity_map.get(identity_key(Room, room_id))
+        if room is not None:
+            session.expire(room, ['member_count'])
+
 class Round(db.Model):
+    __table_args__ = (
+        db.Index('ix_round_room_status', 'room_id', 'status'),
+        # At most one active round per room
+        db.Index('uq_round_active_room', 'room_id', unique=True,
+                 sqlite_where=text("status = 'active'"),
+                 postgresql_where=text("status = 'active'")),
+    )
+
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     room_id = db.Column(db.String(36), db.ForeignKey('room.id'), nullable=False)
     start_at = db.Column(db.DateTime, nullable=False)
     end_at = db.Column(db.DateTime, nullable=False)
     stakes = db.Column(db.Text, default='')  # JSON string for stake descriptions
     status = db.Column(db.String(20), default='active')  # active, completed, cancelled
+    final_stats = db.Column(db.Text, default=None)  # JSON standings frozen when the round closes
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
     room = db.relationship('Room', back_populates='rounds')
     tasks = db.relationship('Task', back_populates='round', cascade='all, delete-orphan')
     votes = db.relationship('Vote', back_populates='round', cascade='all, delete-orphan')
+    scores = db.relationship('RoundScore', back_populates='round', cascade='all, delete-orphan')
+    results = db.relationship('RoundResult', back_populates='round', cascade='all, delete-orphan')
 
     def __repr__(self):
         return f'<Round {self.id} in {self.room_id}>'
@@ -101,6 +156,12 @@ class Round(db.Model):
         }
 
 class Task(db.Model):
+    __table_args__ = (
+        db.Index('ix_task_round_approved', 'round_id', 'approved'),
+        db.Index('ix_task_round_flagged', 'round_id', 'flagged_count'),
+        db.Index('ix_task_round_created', 'round_id', 'created_at', 'id'),
+    )
+
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     round_id = db.Column(db.String(36), db.ForeignKey('round.id'), nullable=False)
     creator_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
@@ -111,10 +172,14 @@ class Task(db.Model):
     target_unit = db.Column(db.String(20), default='')  # minutes, pages, reps, etc.
     proof_url = db.Column(db.String(500), default='')
     proof_type = db.Column(db.String(20), default='')  # photo, screenshot, text, etc.
+    proof_thumbnail_url = db.Column(db.String(500), default='')  # rendered in the background
+    proof_display_url = db.Column(db.String(500), default='')
     approved = db.Column(db.Boolean, default=None)  # None=pending, True/False after approval
     points = db.Column(db.Integer, default=0)
     difficulty_multiplier = db.Column(db.Float, default=1.0)
     flagged_count = db.Column(db.Integer, default=0)
+    flag_votes = db.Column(db.Integer, default=0)  # running tally of flag_validation votes
+    flag_votes_invalid = db.Column(db.Integer, default=0)  # of which voted invalid
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     completed_at = db.Column(db.DateTime, default=None)
     
@@ -126,6 +191,14 @@ class Task(db.Model):
     def __repr__(self):
         return f'<Task {self.title} by {self.creator_id}>'
 
+    def proof_preview_url(self, variant='thumbnail'):
+        """URL of a proof variant (thumbnail, display or original), falling back to the original"""
+        if variant == 'thumbnail' and self.proof_thumbnail_url:
+            return self.proof_thumbnail_url
+        if variant == 'display' and self.proof_display_url:
+            return self.proof_display_url
+        return self.proof_url
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -138,6 +211,8 @@ class Task(db.Model):
             'target_unit': self.target_unit,
             'proof_url': self.proof_url,
             'proof_type': self.proof_type,
+            'proof_thumbnail_url': self.proof_thumbnail_url,
+            'proof_display_url': self.proof_display_url,
             'approved': self.approved,
             'points': self.points,
             'difficulty_multiplier': self.difficulty_multiplier,
@@ -148,12 +223,25 @@ class Task(db.Model):
         }
 
 class Vote(db.Model):
+    __table_args__ = (
+        db.Index('ix_vote_task_type_voter', 'task_id', 'vote_type', 'voter_id'),
+        db.Index('ix_vote_round_type', 'round_id', 'vote_type'),
+        # One flag validation vote per user and task
+        db.Index('uq_vote_flag_validation', 'task_id', 'voter_id', unique=True,
+                 sqlite_where=text("vote_type = 'flag_validation'"),
+                 postgresql_where=text("vote_type = 'flag_validation'")),
+        # One flag per user and task
+        db.Index('uq_vote_flag', 'task_id', 'voter_id', unique=True,
+                 sqlite_where=text("vote_type = 'flag'"),
+                 postgresql_where=text("vote_type = 'flag'")),
+    )
+
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     round_id = db.Column(db.String(36), db.ForeignKey('round.id'), nullable=False)
     voter_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
     task_id = db.Column(db.String(36), db.ForeignKey('task.id'), nullable=False)
     vote = db.Column(db.Boolean, nullable=False)  # True = valid, False = invalid/too easy
-    vote_type = db.Column(db.String(20), default='approval')  # approval, flag_validation
+    vote_type = db.Column(db.String(20), default='approval')  # approval, flag, flag_validation
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -176,3 +264,95 @@ class Vote(db.Model):
             'voter': self.voter.to_dict() if self.voter else None
         }
 
+
+class RoundScore(db.Model):
+    """Materialized leaderboard row: approved points per user in a round"""
+    __table_args__ = (
+        db.UniqueConstraint('round_id', 'user_id'),
+        db.Index('ix_round_score_round_points', 'round_id', 'total_points'),
+    )
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    round_id = db.Column(db.String(36), db.ForeignKey('round.id'), nullable=False)
+    user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
+    total_points = db.Column(db.Float, default=0.0)  # sum of points * difficulty_multiplier
+    task_count = db.Column(db.Integer, default=0)  # approved tasks counted in total_points
+    
+    # Relationships
+    round = db.relationship('Round', back_populates='scores')
+    user = db.relationship('User', back_populates='round_scores')
+
+    def __repr__(self):
+        return f'<RoundScore {self.user_id} in {self.round_id}: {self.total_points}>'
+
+    def to_dict(self):
+        return {
+            'round_id': self.round_id,
+            'user_id': self.user_id,
+            'total_points': self.total_points,
+            'task_count': self.task_count
+        }
+
+class RoundResult(db.Model):
+    """Final placing of a user in a completed round, written once at close"""
+    __table_args__ = (
+        db.UniqueConstraint('round_id', 'user_id'),
+        db.Index('ix_round_result_round_rank', 'round_id', 'rank'),
+    )
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    round_id = db.Column(db.String(36), db.ForeignKey('round.id'), nullable=False)
+    user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
+    rank = db.Column(db.Integer, nullable=False)
+    total_points = db.Column(db.Float, default=0.0)
+    task_count = db.Column(db.Integer, default=0)
+    
+    # Relationships
+    round = db.relationship('Round', back_populates='results')
+    user = db.relationship('User')
+
+    def __repr__(self):
+        return f'<RoundResult {self.user_id} #{self.rank} in {self.round_id}>'
+
+    def to_dict(self):
+        return {
+            'round_id': self.round_id,
+            'user_id': self.user_id,
+            'rank': self.rank,
+            'total_points': self.total_points,
+            'task_count': self.task_count
+        }
+
+class RoomStanding(db.Model):
+    """All-time standing of a user in a room, accumulated from round results"""
+    __table_args__ = (
+        db.UniqueConstraint('room_id', 'user_id'),
+        db.Index('ix_room_standing_room_points', 'room_id', 'total_points'),
+    )
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    room_id = db.Column(db.String(36), db.ForeignKey('room.id'), nullable=False)
+    user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
+    total_points = db.Column(db.Float, default=0.0)
+    task_count = db.Column(db.Integer, default=0)
+    rounds_played = db.Column(db.Integer, default=0)
+    rounds_won = db.Column(db.Integer, default=0)
+    podiums = db.Column(db.Integer, default=0)  # top-three finishes
+    
+    # Relationships
+    room = db.relationship('Room', back_populates='standings')
+    user = db.relationship('User')
+
+    def __repr__(self):
+        return f'<RoomStanding {self.user_id} in {self.room_id}: {self.total_points}>'
+
+    def to_dict(self):
+        return {
+            'room_id': self.room_id,
+            'user_id': self.user_id,
+            'total_points': self.total_points,
+            'task_count': self.task_count,
+            'rounds_played': self.rounds_played,
+            'rounds_won': self.rounds_won,
+            'podiums': self.podiums
+        }
@@ -0,0 +1,174 @@
+from datetime import datetime, timedelta
+import threading
+import uuid
+from src.models.user import db
+from src.server import in_app_context
+
+# Which sessions are online in which room. The in-process store only works
+# with a single worker; the database store shares presence between workers
+# (and hosts) through the application database. Each worker refreshes
+# last_seen on its own sessions every heartbeat, so sessions of a worker that
+# died without clearing them are hidden once they go stale and then pruned.
+
+class MemoryPresenceStore:
+    """Presence kept in process memory"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sessions = {}  # session_id -> {session_id, room_id, user_id, user_name}
+        self.rooms = {}     # room_id -> set of session_ids
+
+    def add(self, session_id, room_id, user_id, user_name):
+        """Record a session as online in a room"""
+        with self.lock:
+            previous = self.sessions.get(session_id)
+            if previous:
+                self.rooms.get(previous['room_id'], set()).discard(session_id)
+            self.sessions[session_id] = {
+                'session_id': session_id,
+                'room_id': room_id,
+                'user_id': user_id,
+                'user_name': user_name
+            }
+            self.rooms.setdefault(room_id, set()).add(session_id)
+
+    def remove(self, session_id):
+        """Forget a session; returns its data, or None if it was not online"""
+        with self.lock:
+            session = self.sessions.pop(session_id, None)
+            if session:
+                members = self.rooms.get(session['room_id'])
+                if members is not None:
+                    members.discard(session_id)
+                    if not members:
+                        del self.rooms[session['room_id']]
+            return session
+
+    def get(self, session_id):
+        """Data for an online session, or None"""
+        with self.lock:
+            return self.sessions.get(session_id)
+
+    def room_sessions(self, room_id):
+        """All online sessions in a room"""
+        with self.lock:
+            return [self.sessions[sid] for sid in self.rooms.get(room_id, ())]
+
+    def init_app(self, app, socketio, heartbeat_seconds=30, ttl_seconds=90):
+        """Nothing to refresh: sessions die with the process"""
+
+    def clear_host(self):
+        """Drop every session (on shutdown)"""
+        with self.lock:
+            self.sessions.clear()
+            self.rooms.clear()
+
+class PresenceSession(db.Model):
+    """Online socket session, shared between workers by DatabasePresenceStore"""
+    __table_args__ = (
+        db.Index('ix_presence_session_room', 'room_id'),
+        db.Index('ix_presence_session_host', 'host_id'),
+        db.Index('ix_presence_session_last_seen', 'last_seen'),
+    )
+
+    session_id = db.Column(db.String(64), primary_key=True)
+    room_id = db.Column(db.String(36), nullable=False)
+    user_id = db.Column(db.String(36), nullable=False)
+    user_name = db.Column(db.String(80), default='')
+    host_id = db.Column(db.String(32), nullable=False)  # worker that owns the socket
+    connected_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_seen = db.Column(db.DateTime, default=datetime.utcnow)  # refreshed by the owning worker's heartbeat
+
+    def to_dict(self):
+        return {
+            'session_id': self.session_id,
+            'room_id': self.room_id,
+            'user_id': self.user_id,
+            'user_name': self.user_name
+        }
+
+class DatabasePresenceStore:
+    """Presence kept in the application database, visible to every worker"""
+
+    def __init__(self):
+        self.host_id = uuid.uuid4().hex
+        self.app = None
+        self.socketio = None
+        self.heartbeat_interval = 30.0
+        self.ttl = timedelta(seconds=90)
+
+    def init_app(self, app, socketio, heartbeat_seconds=30, ttl_seconds=90):
+        """Start this worker's heartbeat"""
+        self.app = app
+        self.socketio = socketio
+        self.heartbeat_interval = float(heartbeat_seconds)
+        self.ttl = timedelta(seconds=ttl_seconds)
+        socketio.start_background_task(self.run)
+
+    def heartbeat(self):
+        """Mark this worker's sessions as seen and prune sessions of workers that stopped"""
+        now = datetime.utcnow()
+        PresenceSession.query.filter_by(host_id=self.host_id).update(
+            {PresenceSession.last_seen: now}, synchronize_session=False
+        )
+        PresenceSession.query.filter(
+            db.or_(PresenceSession.last_seen.is_(None), PresenceSession.last_seen < now - self.ttl)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+
+    def run(self):
+        """Background loop: heartbeat every interval"""
+        while True:
+            try:
+                in_app_context(self.app, self.heartbeat)
+            except Exception as e:
+                print(f'Error in presence heartbeat: {str(e)}')
+            self.socketio.sleep(self.heartbeat_interval)
+
+    def add(self, session_id, room_id, user_id, user_name):
+        """Record a session as online in a room"""
+        db.session.merge(PresenceSession(
+            session_id=session_id,
+            room_id=room_id,
+            user_id=user_id,
+            user_name=user_name,
+            host_id=self.host_id,
+            last_seen=datetime.utcnow()
+        ))
+        db.session.commit()
+
+    def remove(self, session_id):
+        """Forget a session; returns its data, or None if it was not online"""
+        session = PresenceSession.query.get(session_id)
+        if not session:
+            return None
+        data = session.to_dict()
+        db.session.delete(session)
+        db.session.commit()
+        return data
+
+    def get(self, session_id):
+        """Data for an online session, or None"""
+        session = PresenceSession.query.get(session_id)
+        return session.to_dict() if session else None
+
+    def room_sessions(self, room_id):
+        """All online sessions in a room, skipping ones whose worker stopped heartbeating"""
+        sessions = PresenceSession.query.filter(
+            PresenceSession.room_id == room_id,
+            PresenceSession.last_seen >= datetime.utcnow() - self.ttl
+        )
+        return [session.to_dict() for session in sessions]
+
+    def clear_host(self):
+        """Drop every session owned by this worker (on shutdown)"""
+        PresenceSession.query.filter_by(host_id=self.host_id).delete()
+        db.session.commit()
+
+def create_presence_store(backend):
+    """Build the presence store named by PRESENCE_BACKEND (memory or database)"""
+    if backend == 'memory':
+        return MemoryPresenceStore()
+    if backend == 'database':
+        return DatabasePresenceStore()
+    raise ValueError(f'Unknown presence backend: {backend}')
@@ -0,0 +1,146 @@
+import hashlib
+import secrets
+import threading
+from sqlalchemy.exc import IntegrityError
+from src.models.user import db
+from src.config import ROOM_CODE_KEY, ROOM_CODE_BLOCK_SIZE
+
+# Room code allocation without lookups. Each room takes the next number from
+# a database sequence and its code is that number run through a keyed
+# permutation of the code space, so distinct numbers always give distinct,
+# unguessable codes. The key is random per database, stored on the sequence
+# row (or set with ROOM_CODE_KEY), so codes cannot be enumerated from the
+# source. Workers reserve sequence numbers in blocks with one atomic UPDATE,
+# so creating a room costs no extra query; the unique index on room.code
+# only has to catch codes issued before this allocator.
+
+CODE_ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+CODE_LENGTH = 6
+CODE_SPACE = len(CODE_ALPHABET) ** CODE_LENGTH
+FEISTEL_ROUNDS = 4
+
+class CodeSequence(db.Model):
+    """Next unreserved value of a named sequence"""
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+    secret = db.Column(db.String(64))  # permutation key, generated on first use
+
+    def __repr__(self):
+        return f'<CodeSequence {self.name} {self.value}>'
+
+def round_function(key, round_number, half):
+    """Keyed 16-bit pseudo-random function for one Feistel round"""
+    digest = hashlib.blake2b(bytes((round_number,)) + half.to_bytes(2, 'big'), key=key, digest_size=2).digest()
+    return int.from_bytes(digest, 'big')
+
+def permute(number, key):
+    """Map a number in [0, CODE_SPACE) to another, one-to-one.
+
+    A balanced Feistel network permutes 32-bit values; results outside the
+    code space are fed back in (cycle walking) until one lands inside it,
+    which keeps the mapping a bijection on the code space itself.
+    """
+    if not 0 <= number < CODE_SPACE:
+        raise ValueError(f'{number} is outside the room code space')
+    value = number
+    while True:
+        left, right = value >> 16, value & 0xFFFF
+        for round_number in range(FEISTEL_ROUNDS):
+            left, right = right, left ^ round_function(key, round_number, right)
+        value = (left << 16) | right
+        if value < CODE_SPACE:
+            return value
+
+def encode(number):
+    """Fixed-length code for a number in the code space"""
+    chars = []
+    for _ in range(CODE_LENGTH):
+        number, digit = divmod(number, len(CODE_ALPHABET))
+        chars.append(CODE_ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+class RoomCodeAllocator:
+    """Hands out room codes from sequence blocks reserved by this worker"""
+
+    def __init__(self, name='room_code', key=ROOM_CODE_KEY, block_size=ROOM_CODE_BLOCK_SIZE):
+        self.name = name
+        self.secret = key  # None: use the random key stored on the sequence row
+        self.key = None
+        self.block_size = max(1, block_size)
+        self.lock = threading.Lock()
+        self.next_value = 0
+        self.block_end = 0
+
+    def stored_secret(self):
+        """The random key stored on the sequence row, generated if there is none yet"""
+        sequence = CodeSequence.__table__
+        while True:
+            with db.engine.begin() as connection:
+                row = connection.execute(
+                    sequence.select().where(sequence.c.name == self.name)
+                ).first()
+                if row is not None and row.secret:
+                    return row.secret
+                if row is not None:
+                    # Only the first worker's key sticks; the others re-read it
+                    connection.execute(
+                        sequence.update()
+                        .where(sequence.c.name == self.name, sequence.c.secret.is_(None))
+                        .values(secret=secrets.token_hex(32))
+                    )
+                    continue
+            try:
+                with db.engine.begin() as connection:
+                    connection.execute(sequence.insert().values(
+                        name=self.name, value=0, secret=secrets.token_hex(32)
+                    ))
+            except IntegrityError:
+                continue  # another worker created the row first; use its key
+
+    def load_key(self):
+        """Permutation key from ROOM_CODE_KEY or the stored random key"""
+        secret = self.secret or self.stored_secret()
+        return hashlib.sha256(secret.encode()).digest()
+
+    def reserve_block(self):
+        """Claim the next block of sequence values; returns (start, end).
+
+        Runs on its own connection and commits at once, so a request that
+        rolls back never hands its block to another worker.
+        """
+        sequence = CodeSequence.__table__
+        while True:
+            with db.engine.begin() as connection:
+                end = connection.execute(
+                    sequence.update()
+                    .where(sequence.c.name == self.name)
+                    .values(value=sequence.c.value + self.block_size)
+                    .returning(sequence.c.value)
+                ).scalar()
+            if end is not None:
+                return end - self.block_size, end
+            try:
+                with db.engine.begin() as connection:
+                    connection.execute(sequence.insert().values(name=self.name, value=self.block_size))
+                return 0, self.block_size
+            except IntegrityError:
+                continue  # another worker created the row first; reserve from it
+
+    def next_number(self):
+        """Next sequence value, reserving a new block when this one runs out"""
+        with self.lock:
+            if self.key is None:
+                self.key = self.load_key()
+            if self.next_value >= self.block_end:
+                self.next_value, self.block_end = self.reserve_block()
+            number = self.next_value
+            self.next_value += 1
+        if number >= CODE_SPACE:
+            raise RuntimeError('Room code space exhausted')
+        return number
+
+    def allocate(self):
+        """A room code no other allocation will return"""
+        return encode(permute(self.next_number(), self.key))
+
+room_codes = RoomCodeAllocator()
@@ -0,0 +1,145 @@
+from datetime import datetime, timezone
+import heapq
+import json
+import threading
+from src.models.user import db, Round
+from src.leaderboard import get_round_stats_data, record_round_results, leaderboard_publisher
+from src.server import in_app_context
+from src import events
+
+def utc_naive(value):
+    """A datetime as naive UTC, the form stored in the database"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def close_round(round_id, ended_at=None):
+    """Complete an active round, freeze its final standings and record its results.
+
+    The round is claimed with a conditional UPDATE so that, with several
+    workers racing on the same deadline, exactly one of them closes it.
+    `ended_at` replaces end_at for rounds ended early. Returns the closed
+    Round, or None if it was not active.
+    """
+    claimed = Round.query.filter_by(id=round_id, status='active').update(
+        {Round.status: 'completed'}, synchronize_session=False
+    )
+    if not claimed:
+        db.session.rollback()
+        return None
+
+    # Set through the ORM as well so the cache and version flush hooks see the change
+    round_obj = db.session.get(Round, round_id)
+    round_obj.status = 'completed'
+    if ended_at is not None:
+        round_obj.end_at = utc_naive(ended_at)
+    stats = get_round_stats_data(round_id)
+    round_obj.final_stats = json.dumps(stats)
+    record_round_results(round_id, round_obj.room_id, stats)
+    db.session.commit()
+
+    events.round_ended(round_obj, stats)
+    leaderboard_publisher.forget(round_id)
+    return round_obj
+
+def hold_active_round(round_id):
+    """Check that a round is active and keep it open until this transaction ends.
+
+    Writes that change a round's tasks or scores call this before writing,
+    even after checking the cached round status: the cache can be stale for
+    rounds another worker or the scheduler has just closed. The no-op UPDATE
+    takes the round's row lock (the write lock on SQLite), so a close_round
+    racing with the write waits for it and freezes standings that include
+    it; once a round is closed nothing matches and False is returned.
+    """
+    held = Round.query.filter_by(id=round_id, status='active').update(
+        {Round.status: Round.status}, synchronize_session=False
+    )
+    return bool(held)
+
+def final_round_stats(round_id):
+    """Frozen final standings of a completed round, or None"""
+    final_stats = db.session.query(Round.final_stats).filter(Round.id == round_id).scalar()
+    return json.loads(final_stats) if final_stats else None
+
+class RoundScheduler:
+    """Closes rounds when their end_at passes.
+
+    Deadlines are kept in a heap of (end_at, round_id). A background task
+    wakes every tick, closes every round whose deadline has passed, and
+    reloads the heap from the database every refresh interval to pick up
+    rounds created by other workers. Stale entries (rounds ended by hand or
+    by another worker) are dropped when close_round finds them inactive.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.socketio = None
+        self.tick = 1.0
+        self.refresh_interval = 60.0
+        self.lock = threading.Lock()
+        self.deadlines = []     # heap of (end_at, round_id)
+        self.scheduled = set()  # round_ids in the heap
+
+    def init_app(self, app, socketio, refresh_seconds=60):
+        """Load active rounds and start the scheduler loop for an app"""
+        self.app = app
+        self.socketio = socketio
+        self.refresh_interval = float(refresh_seconds)
+        socketio.start_background_task(self.run)
+
+    def schedule(self, round_id, end_at):
+        """Close a round at end_at"""
+        if self.socketio is None:
+            return
+        with self.lock:
+            if round_id not in self.scheduled:
+                self.scheduled.add(round_id)
+                heapq.heappush(self.deadlines, (utc_naive(end_at), round_id))
+
+    def load(self):
+        """Schedule every active round in the database"""
+        rounds = db.session.query(Round.id, Round.end_at).filter(Round.status == 'active').all()
+        for round_id, end_at in rounds:
+            self.schedule(round_id, end_at)
+
+    def due(self, now):
+        """Pop the ids of rounds whose deadline is at or before now"""
+        due = []
+        with self.lock:
+            while self.deadlines and self.deadlines[0][0] <= now:
+                _, round_id = heapq.heappop(self.deadlines)
+                self.scheduled.discard(round_id)
+                due.append(round_id)
+        return due
+
+    def close_due(self, round_ids):
+        """Close a batch of due rounds; a failure on one does not stop the rest"""
+        for round_id in round_ids:
+            try:
+                round_obj = close_round(round_id)
+                if round_obj:
+                    print(f'Round {round_id} closed at its deadline')
+            except Exception as e:
+                db.session.rollback()
+                print(f'Error closing round {round_id}: {str(e)}')
+
+    def run(self):
+        """Background loop: close rounds as their deadlines pass"""
+        next_refresh = 0.0
+        elapsed = 0.0
+        while True:
+            try:
+                if elapsed >= next_refresh:
+                    in_app_context(self.app, self.load)
+                    next_refresh = elapsed + self.refresh_interval
+
+                due = self.due(datetime.utcnow())
+                if due:
+                    in_app_context(self.app, self.close_due, due)
+            except Exception as e:
+                print(f'Error in round scheduler: {str(e)}')
+            self.socketio.sleep(self.tick)
+            elapsed += self.tick
+
+round_scheduler = RoundScheduler()
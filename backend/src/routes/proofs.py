@@ -0,0 +1,26 @@
+from flask import Blueprint, jsonify, send_file
+from src.uploads import PROOF_EXTENSIONS, blob_path
+import os
+import re
+
+proofs_bp = Blueprint('proofs', __name__)
+
+DIGEST_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+# Blobs are named by their content hash, so a URL never changes meaning
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+@proofs_bp.route('/proofs/<digest>.<extension>', methods=['GET'])
+def get_proof(digest, extension):
+    """Serve a proof blob with a strong ETag, immutable caching and Range support"""
+    if not DIGEST_PATTERN.match(digest) or extension not in PROOF_EXTENSIONS.values():
+        return jsonify({'success': False, 'error': 'Proof not found'}), 404
+
+    path = blob_path(digest, extension)
+    if not os.path.isfile(path):
+        return jsonify({'success': False, 'error': 'Proof not found'}), 404
+
+    response = send_file(path, etag=digest, conditional=True, max_age=31536000)
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    response.headers['Accept-Ranges'] = 'bytes'
+    return response
@@ -1,16 +1,35 @@
 from flask import Blueprint, request, jsonify
+from sqlalchemy.exc import IntegrityError
 from src.models.user import db, User, Room, RoomMember
-import random
-import string
+from src.serializers import MEMBER_SERIALIZER
+from src.versions import versioned
+from src.room_codes import room_codes
 
 rooms_bp = Blueprint('rooms', __name__)
 
-def generate_room_code():
-    """Generate a unique 6-character room code"""
-    while True:
-        code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-        if not Room.query.filter_by(code=code).first():
-            return code
+def insert_room(name, attempts=5):
+    """Add a room under a newly allocated 6-character code.
+
+    Allocated codes never repeat, so the unique index on room.code only
+    rejects one that clashes with a code from the old random generator;
+    the room is then retried under the next code.
+    """
+    for _ in range(attempts):
+        room = Room(code=room_codes.allocate(), name=name)
+        db.session.add(room)
+        try:
+            db.session.flush()
+            return room
+        except IntegrityError:
+            db.session.rollback()
+    raise RuntimeError('Could not allocate a room code')
+
+def room_members_data(room_id):
+    """Members of a room with user details, in join order"""
+    rows = MEMBER_SERIALIZER.select().outerjoin(
+        User, RoomMember.user_id == User.id
+    ).filter(RoomMember.room_id == room_id).order_by(RoomMember.joined_at.asc()).all()
+    return MEMBER_SERIALIZER.to_dicts(rows)
 
 @rooms_bp.route('/rooms', methods=['POST'])
 def create_room():
@@ -20,13 +39,9 @@ def create_room():
         name = data.get('name', 'New Room')
         creator_name = data.get('creator_name', 'Host')
         
-        # Generate unique room code
-        code = generate_room_code()
-        
-        # Create room
-        room = Room(code=code, name=name)
-        db.session.add(room)
-        db.session.flush()  # Get the room ID
+        # Create room under a unique code
+        room = insert_room(name)
+        code = room.code
         
         # Create or get user
         user = User(name=creator_name)
@@ -98,6 +113,7 @@ def join_room():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @rooms_bp.route('/rooms/<room_id>', methods=['GET'])
+@versioned('room:{room_id}:members')
 def get_room(room_id):
     """Get room details with members"""
     try:
@@ -106,10 +122,7 @@ def get_room(room_id):
             return jsonify({'success': False, 'error': 'Room not found'}), 404
         
         # Get all members with user details
-        members = []
-        for member in room.members:
-            member_data = member.to_dict()
-            members.append(member_data)
+        members = room_members_data(room_id)
         
         room_data = room.to_dict()
         room_data['members'] = members
@@ -123,6 +136,7 @@ def get_room(room_id):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @rooms_bp.route('/rooms/<room_id>/members', methods=['GET'])
+@versioned('room:{room_id}:members')
 def get_room_members(room_id):
     """Get all members of a room"""
     try:
@@ -130,7 +144,7 @@ def get_room_members(room_id):
         if not room:
             return jsonify({'success': False, 'error': 'Room not found'}), 404
         
-        members = [member.to_dict() for member in room.members]
+        members = room_members_data(room_id)
         
         return jsonify({
             'success': True,
@@ -1,5 +1,14 @@
 from flask import Blueprint, request, jsonify
-from src.models.user import db, User, Room, Round, Task, RoomMember
+from sqlalchemy.exc import IntegrityError
+from src.models.user import db, User, Round, RoundResult, RoomStanding
+from src.leaderboard import get_round_stats_data, assign_ranks
+from src.round_scheduler import round_scheduler, close_round, final_round_stats
+from src.analytics import analytics_available, room_analytics
+from src.cache import get_room_info, get_round_info, get_member_name, get_active_round_id
+from src.serializers import ROUND_SERIALIZER, WINNER_SERIALIZER, STANDING_SERIALIZER
+from src.versions import get_versions, versioned
+from src.routes.tasks import is_unique_violation
+from src import events
 from datetime import datetime, timedelta
 import json
 
@@ -20,18 +29,16 @@ def create_round():
             return jsonify({'success': False, 'error': 'Room ID is required'}), 400
         
         # Verify room exists
-        room = Room.query.get(room_id)
-        if not room:
+        if not get_room_info(room_id):
             return jsonify({'success': False, 'error': 'Room not found'}), 404
         
         # Verify user is a member and preferably host
-        member = RoomMember.query.filter_by(room_id=room_id, user_id=user_id).first()
-        if not member:
+        if get_member_name(room_id, user_id) is None:
             return jsonify({'success': False, 'error': 'User not a member of this room'}), 403
         
-        # Check if there's already an active round
-        active_round = Round.query.filter_by(room_id=room_id, status='active').first()
-        if active_round:
+        # Check if there's already an active round. Read the database, not the
+        # cache: another worker may have started one since it was filled
+        if Round.query.filter_by(room_id=room_id, status='active').first():
             return jsonify({'success': False, 'error': 'Room already has an active round'}), 400
         
         # Parse dates
@@ -51,7 +58,17 @@ def create_round():
         )
         
         db.session.add(round_obj)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            # A round started concurrently won the one-active-round index
+            db.session.rollback()
+            if not is_unique_violation(e, 'uq_round_active_room'):
+                raise
+            return jsonify({'success': False, 'error': 'Room already has an active round'}), 400
+        
+        round_scheduler.schedule(round_obj.id, round_obj.end_at)
+        events.round_started(round_obj)
         
         return jsonify({
             'success': True,
@@ -90,23 +107,17 @@ def end_round(round_id):
             return jsonify({'success': False, 'error': 'Round not found'}), 404
         
         # Verify user is a member of the room
-        member = RoomMember.query.filter_by(room_id=round_obj.room_id, user_id=user_id).first()
-        if not member:
+        if get_member_name(round_obj.room_id, user_id) is None:
             return jsonify({'success': False, 'error': 'User not authorized to end this round'}), 403
         
-        # Update round status
-        round_obj.status = 'completed'
-        round_obj.end_at = datetime.utcnow()  # Update actual end time
-        
-        db.session.commit()
-        
-        # Get final stats
-        stats = get_round_stats_data(round_id)
+        # Close the round now and freeze its standings
+        if not close_round(round_id, datetime.utcnow()):
+            return jsonify({'success': False, 'error': 'Round is not active'}), 400
         
         return jsonify({
             'success': True,
             'round': round_obj.to_dict(),
-            'final_stats': stats
+            'final_stats': json.loads(round_obj.final_stats)
         }), 200
         
     except Exception as e:
@@ -114,80 +125,55 @@ def end_round(round_id):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @rounds_bp.route('/rounds/<round_id>/stats', methods=['GET'])
+@versioned('round:{round_id}:stats')
 def get_round_stats(round_id):
     """Get current round statistics and leaderboard"""
     try:
-        round_obj = Round.query.get(round_id)
-        if not round_obj:
+        round_info = get_round_info(round_id)
+        if not round_info:
             return jsonify({'success': False, 'error': 'Round not found'}), 404
         
-        stats = get_round_stats_data(round_id)
+        # Version the leaderboard_updated diffs continue from; read before the data
+        version, = get_versions([f'round:{round_id}:stats'])
+        
+        # Completed rounds are served from the snapshot frozen at close
+        stats = final_round_stats(round_id) if round_info['status'] == 'completed' else None
+        if stats is None:
+            stats = get_round_stats_data(round_id)
         
         return jsonify({
             'success': True,
             'round_id': round_id,
+            'version': version,
             'stats': stats
         }), 200
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-def get_round_stats_data(round_id):
-    """Helper function to calculate round statistics"""
-    # Get all approved tasks for this round
-    approved_tasks = Task.query.filter_by(round_id=round_id, approved=True).all()
-    
-    # Calculate points per user
-    user_points = {}
-    user_task_counts = {}
-    
-    for task in approved_tasks:
-        user_id = task.creator_id
-        points = task.points * task.difficulty_multiplier
-        
-        if user_id not in user_points:
-            user_points[user_id] = 0
-            user_task_counts[user_id] = 0
-        
-        user_points[user_id] += points
-        user_task_counts[user_id] += 1
-    
-    # Get user details and create leaderboard
-    leaderboard = []
-    for user_id, points in user_points.items():
-        user = User.query.get(user_id)
-        if user:
-            leaderboard.append({
-                'user_id': user_id,
-                'user_name': user.name,
-                'user_avatar': user.avatar,
-                'total_points': points,
-                'task_count': user_task_counts[user_id]
-            })
-    
-    # Sort by points descending
-    leaderboard.sort(key=lambda x: x['total_points'], reverse=True)
-    
-    # Add rankings
-    for i, entry in enumerate(leaderboard):
-        entry['rank'] = i + 1
-    
-    return {
-        'leaderboard': leaderboard,
-        'total_tasks': len(approved_tasks),
-        'total_points_awarded': sum(user_points.values())
-    }
-
 @rounds_bp.route('/rooms/<room_id>/rounds', methods=['GET'])
+@versioned('room:{room_id}:rounds')
 def get_room_rounds(room_id):
     """Get all rounds for a room"""
     try:
-        room = Room.query.get(room_id)
-        if not room:
+        if not get_room_info(room_id):
             return jsonify({'success': False, 'error': 'Room not found'}), 404
         
-        rounds = Round.query.filter_by(room_id=room_id).order_by(Round.created_at.desc()).all()
-        rounds_data = [round_obj.to_dict() for round_obj in rounds]
+        rounds = ROUND_SERIALIZER.select().filter(Round.room_id == room_id).order_by(Round.created_at.desc()).all()
+        rounds_data = ROUND_SERIALIZER.to_dicts(rounds)
+        
+        # Winners come from the result rows written at close, not from tasks
+        winners = WINNER_SERIALIZER.select().join(
+            User, RoundResult.user_id == User.id
+        ).join(
+            Round, RoundResult.round_id == Round.id
+        ).filter(Round.room_id == room_id, RoundResult.rank == 1).all()
+        
+        winners_by_round = {}
+        for winner in WINNER_SERIALIZER.to_dicts(winners):
+            winners_by_round.setdefault(winner.pop('round_id'), []).append(winner)
+        for round_data in rounds_data:
+            round_data['winners'] = winners_by_round.get(round_data['id'], [])
         
         return jsonify({
             'success': True,
@@ -197,15 +183,59 @@ def get_room_rounds(room_id):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@rounds_bp.route('/rooms/<room_id>/standings', methods=['GET'])
+@versioned('room:{room_id}:rounds')
+def get_room_standings(room_id):
+    """Get the all-time standings of a room across its completed rounds"""
+    try:
+        if not get_room_info(room_id):
+            return jsonify({'success': False, 'error': 'Room not found'}), 404
+        
+        standings = STANDING_SERIALIZER.select().outerjoin(
+            User, RoomStanding.user_id == User.id
+        ).filter(RoomStanding.room_id == room_id).order_by(
+            RoomStanding.total_points.desc(), RoomStanding.rounds_won.desc(), RoomStanding.user_id.asc()
+        ).all()
+        
+        standings_data = assign_ranks(STANDING_SERIALIZER.to_dicts(standings), ('total_points', 'rounds_won'))
+        
+        return jsonify({
+            'success': True,
+            'standings': standings_data
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@rounds_bp.route('/rooms/<room_id>/analytics', methods=['GET'])
+def get_room_analytics(room_id):
+    """Get per-user and per-template statistics across all rounds of a room"""
+    try:
+        if not analytics_available():
+            return jsonify({'success': False, 'error': 'Room analytics require NumPy'}), 501
+        
+        if not get_room_info(room_id):
+            return jsonify({'success': False, 'error': 'Room not found'}), 404
+        
+        return jsonify({
+            'success': True,
+            'room_id': room_id,
+            'analytics': room_analytics(room_id)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @rounds_bp.route('/rooms/<room_id>/active-round', methods=['GET'])
+@versioned('room:{room_id}:rounds')
 def get_active_round(room_id):
     """Get the currently active round for a room"""
     try:
-        room = Room.query.get(room_id)
-        if not room:
+        if not get_room_info(room_id):
             return jsonify({'success': False, 'error': 'Room not found'}), 404
         
-        active_round = Round.query.filter_by(room_id=room_id, status='active').first()
+        active_round_id = get_active_round_id(room_id)
+        active_round = Round.query.get(active_round_id) if active_round_id else None
         
         if not active_round:
             return jsonify({
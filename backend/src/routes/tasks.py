@@ -1,8 +1,21 @@
 from flask import Blueprint, request, jsonify
-from src.models.user import db, User, Room, Round, Task, Vote, RoomMember
+from src.models.user import db, User, Room, Task, Vote
+from src.leaderboard import apply_task_score, apply_task_scores, update_task_approval, revoke_task_points
+from src.cache import get_round_info, get_room_members, get_member_name
+from src.serializers import task_summary_serializer, task_preview_serializer, flagged_task_serializer
+from src.versions import versioned
+from src import events
+from src.config import PROOF_MAX_BYTES, MAX_BATCH_ITEMS
+from src.thumbnails import thumbnail_pipeline
+from src.round_scheduler import hold_active_round
+from src.uploads import (
+    PROOF_EXTENSIONS, EmptyUpload, UploadTooLarge, UploadOffsetMismatch,
+    stage_proof_stream, stage_proof_bytes, store_staged, discard_staged, upload_offset, append_chunk, finalize_upload
+)
+from sqlalchemy import and_, or_, update
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 import base64
-import os
 
 tasks_bp = Blueprint('tasks', __name__)
 
@@ -25,16 +38,16 @@ def create_task_simple():
             return jsonify({'success': False, 'message': 'Missing required fields'}), 400
         
         # Verify round exists and is active
-        round_obj = Round.query.get(round_id)
-        if not round_obj:
+        round_info = get_round_info(round_id)
+        if not round_info:
             return jsonify({'success': False, 'message': 'Round not found'}), 404
         
-        if round_obj.status != 'active':
+        if round_info['status'] != 'active':
             return jsonify({'success': False, 'message': 'Round is not active'}), 400
         
         # Verify user is a member of the room
-        member = RoomMember.query.filter_by(room_id=round_obj.room_id, user_id=user_id).first()
-        if not member:
+        creator_name = get_member_name(round_info['room_id'], user_id)
+        if creator_name is None:
             return jsonify({'success': False, 'message': 'User not a member of this room'}), 403
         
         # Create task
@@ -48,26 +61,16 @@ def create_task_simple():
             created_at=datetime.utcnow()
         )
         
+        rejected = require_active_round(round_id, 'message')
+        if rejected:
+            return rejected
+        
         db.session.add(task)
+        apply_task_score(task)
         db.session.commit()
         
-        # Get user info for response
-        user = User.query.get(user_id)
-        task_dict = {
-            'id': task.id,
-            'round_id': task.round_id,
-            'creator_id': task.creator_id,
-            'template': task.template,
-            'title': task.title,
-            'description': task.description,
-            'points': task.points,
-            'approved': task.approved,
-            'proof_url': task.proof_url,
-            'proof_type': task.proof_type,
-            'flagged_count': task.flagged_count,
-            'created_at': task.created_at.isoformat(),
-            'user': {'name': user.name} if user else None
-        }
+        task_dict = task_summary(task, creator_name)
+        events.task_created(task, round_info['room_id'], creator_name)
         
         return jsonify({
             'success': True,
@@ -78,41 +81,114 @@ def create_task_simple():
         db.session.rollback()
         return jsonify({'success': False, 'message': str(e)}), 500
 
+# Filters accepted by GET /rounds/<round_id>/tasks?status=...
+TASK_STATUS_FILTERS = {
+    'pending': Task.approved.is_(None),
+    'approved': Task.approved.is_(True),
+    'rejected': Task.approved.is_(False)
+}
+
+MAX_TASK_PAGE_SIZE = 500
+
+def task_summary(task, creator_name, proof_variant='thumbnail'):
+    """Compact task representation used by the round task list"""
+    return {
+        'id': task.id,
+        'round_id': task.round_id,
+        'creator_id': task.creator_id,
+        'template': task.template,
+        'title': task.title,
+        'description': task.description,
+        'points': task.points,
+        'approved': task.approved,
+        'proof_url': task.proof_url,
+        'proof_type': task.proof_type,
+        'proof_preview_url': task.proof_preview_url(proof_variant),
+        'flagged_count': task.flagged_count,
+        'created_at': task.created_at.isoformat(),
+        'user': {'name': creator_name} if creator_name else None
+    }
+
+def encode_task_cursor(created_at, task_id):
+    """Encode the (created_at, id) keyset position of a task as an opaque cursor"""
+    position = f"{created_at.isoformat()}|{task_id}"
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+def decode_task_cursor(cursor):
+    """Decode a cursor produced by encode_task_cursor; raises ValueError if malformed"""
+    created_at, task_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+    return datetime.fromisoformat(created_at), task_id
+
 @tasks_bp.route('/rounds/<round_id>/tasks', methods=['GET'])
+@versioned('round:{round_id}:tasks')
 def get_round_tasks(round_id):
-    """Get all tasks for a round"""
+    """Get tasks for a round, optionally filtered and paged.
+
+    Query parameters: status (pending/approved/rejected), creator_id, template,
+    limit and cursor. When limit is given the response carries a next_cursor
+    to pass back for the following page (None on the last page).
+    proof_variant (thumbnail/display/original) selects proof_preview_url.
+    """
     try:
         # Verify round exists
-        round_obj = Round.query.get(round_id)
-        if not round_obj:
+        if not get_round_info(round_id):
             return jsonify({'success': False, 'message': 'Round not found'}), 404
         
-        # Get all tasks for this round
-        tasks = Task.query.filter_by(round_id=round_id).all()
-        
-        task_list = []
-        for task in tasks:
-            user = User.query.get(task.creator_id)
-            task_dict = {
-                'id': task.id,
-                'round_id': task.round_id,
-                'creator_id': task.creator_id,
-                'template': task.template,
-                'title': task.title,
-                'description': task.description,
-                'points': task.points,
-                'approved': task.approved,
-                'proof_url': task.proof_url,
-                'proof_type': task.proof_type,
-                'flagged_count': task.flagged_count,
-                'created_at': task.created_at.isoformat(),
-                'user': {'name': user.name} if user else None
-            }
-            task_list.append(task_dict)
+        status = request.args.get('status')
+        creator_id = request.args.get('creator_id')
+        template = request.args.get('template')
+        cursor = request.args.get('cursor')
+        limit = request.args.get('limit', type=int)
+        proof_variant = request.args.get('proof_variant', 'thumbnail')
+        
+        if status and status not in TASK_STATUS_FILTERS:
+            return jsonify({'success': False, 'message': 'Invalid status filter'}), 400
+        
+        if limit is not None and limit <= 0:
+            return jsonify({'success': False, 'message': 'Limit must be positive'}), 400
+        
+        # Task list columns and creator names in a single query
+        serializer = task_summary_serializer(proof_variant)
+        query = serializer.select().outerjoin(
+            User, Task.creator_id == User.id
+        ).filter(Task.round_id == round_id)
+        
+        if status:
+            query = query.filter(TASK_STATUS_FILTERS[status])
+        if creator_id:
+            query = query.filter(Task.creator_id == creator_id)
+        if template:
+            query = query.filter(Task.template == template)
+        
+        if cursor:
+            try:
+                after_created_at, after_id = decode_task_cursor(cursor)
+            except ValueError:
+                return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+            query = query.filter(or_(
+                Task.created_at > after_created_at,
+                and_(Task.created_at == after_created_at, Task.id > after_id)
+            ))
+        
+        query = query.order_by(Task.created_at.asc(), Task.id.asc())
+        
+        if limit is not None:
+            # Fetch one extra row to know whether another page exists
+            page_size = min(limit, MAX_TASK_PAGE_SIZE)
+            rows = query.limit(page_size + 1).all()
+            has_more = len(rows) > page_size
+            rows = rows[:page_size]
+        else:
+            rows = query.all()
+            has_more = False
+        
+        task_list = serializer.to_dicts(rows)
+        next_cursor = encode_task_cursor(task_list[-1]['created_at'], task_list[-1]['id']) if has_more else None
         
         return jsonify({
             'success': True,
-            'tasks': task_list
+            'tasks': task_list,
+            'next_cursor': next_cursor
         }), 200
         
     except Exception as e:
@@ -145,6 +221,10 @@ TASK_TEMPLATES = {
     }
 }
 
+# Points a client may set directly on a task (batch creation)
+MIN_TASK_POINTS = 1
+MAX_TASK_POINTS = 200
+
 def calculate_task_points(template, target, difficulty_multiplier=1.0):
     """Calculate points for a task based on template and target"""
     config = TASK_TEMPLATES.get(template, TASK_TEMPLATES['time-boxed'])
@@ -161,10 +241,9 @@ def calculate_task_points(template, target, difficulty_multiplier=1.0):
     return int(points * difficulty_multiplier)
 
 @tasks_bp.route('/rounds/<round_id>/tasks', methods=['POST'])
-def create_task():
+def create_task(round_id):
     """Create a new task in a round"""
     try:
-        round_id = request.view_args['round_id']
         data = request.get_json()
         
         creator_id = data.get('creator_id')
@@ -184,16 +263,16 @@ def create_task():
             return jsonify({'success': False, 'error': 'Invalid task template'}), 400
         
         # Verify round exists and is active
-        round_obj = Round.query.get(round_id)
-        if not round_obj:
+        round_info = get_round_info(round_id)
+        if not round_info:
             return jsonify({'success': False, 'error': 'Round not found'}), 404
         
-        if round_obj.status != 'active':
+        if round_info['status'] != 'active':
             return jsonify({'success': False, 'error': 'Round is not active'}), 400
         
         # Verify user is a member of the room
-        member = RoomMember.query.filter_by(room_id=round_obj.room_id, user_id=creator_id).first()
-        if not member:
+        creator_name = get_member_name(round_info['room_id'], creator_id)
+        if creator_name is None:
             return jsonify({'success': False, 'error': 'User not a member of this room'}), 403
         
         # Validate target based on template
@@ -219,25 +298,193 @@ def create_task():
             difficulty_multiplier=difficulty_multiplier
         )
         
+        rejected = require_active_round(round_id)
+        if rejected:
+            return rejected
+        
         db.session.add(task)
+        apply_task_score(task)
         db.session.commit()
         
+        task_data = task.to_dict()
+        events.task_created(task, round_info['room_id'], creator_name)
+        
         return jsonify({
             'success': True,
-            'task': task.to_dict()
+            'task': task_data
         }), 201
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@tasks_bp.route('/tasks/<task_id>/proof', methods=['POST'])
-def upload_proof():
-    """Upload proof of task completion"""
+def require_active_round(round_id, error_key='error'):
+    """Hold a round open for this request's writes (see hold_active_round).
+
+    Returns None if the round is active, else the 400 response to return,
+    after rolling back.
+    """
+    if hold_active_round(round_id):
+        return None
+    db.session.rollback()
+    return jsonify({'success': False, error_key: 'Round is not active'}), 400
+
+def is_unique_violation(error, index_name):
+    """Whether an IntegrityError came from the named unique index.
+
+    PostgreSQL reports the constraint name; SQLite only names the columns,
+    so there any UNIQUE failure counts.
+    """
+    diag = getattr(error.orig, 'diag', None)
+    if diag is not None and getattr(diag, 'constraint_name', None):
+        return diag.constraint_name == index_name
+    return 'UNIQUE constraint failed' in str(error.orig)
+
+def batch_task_error(item):
+    """Why a batch task entry is invalid, or None"""
+    template_type = item.get('template_type')
+    title = item.get('title')
+    description = item.get('description', '')
+    points = item.get('points', 25)
+    if not template_type or not title:
+        return 'Missing required fields'
+    if template_type not in TASK_TEMPLATES:
+        return 'Invalid task template'
+    if not isinstance(title, str) or len(title) > 200:
+        return 'Title must be a string of at most 200 characters'
+    if not isinstance(description, str):
+        return 'Description must be a string'
+    if isinstance(points, bool) or not isinstance(points, int) or not MIN_TASK_POINTS <= points <= MAX_TASK_POINTS:
+        return f'Points must be an integer from {MIN_TASK_POINTS} to {MAX_TASK_POINTS}'
+    return None
+
+def batch_items(data, field):
+    """The list of items under `field` in a batch request body, or an error message"""
+    items = data.get(field)
+    if not isinstance(items, list) or not items:
+        return None, f'{field} must be a non-empty list'
+    if len(items) > MAX_BATCH_ITEMS:
+        return None, f'At most {MAX_BATCH_ITEMS} {field} per request'
+    if not all(isinstance(item, dict) for item in items):
+        return None, f'Every entry in {field} must be an object'
+    return items, None
+
+@tasks_bp.route('/rounds/<round_id>/tasks/batch', methods=['POST'])
+def create_tasks_batch(round_id):
+    """Create several tasks for one user in a single transaction"""
     try:
-        task_id = request.view_args['task_id']
         data = request.get_json()
         
+        user_id = data.get('user_id')
+        if not user_id:
+            return jsonify({'success': False, 'error': 'Missing required fields'}), 400
+        
+        items, error = batch_items(data, 'tasks')
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+        
+        # Round and membership are checked once for the whole batch
+        round_info = get_round_info(round_id)
+        if not round_info:
+            return jsonify({'success': False, 'error': 'Round not found'}), 404
+        
+        if round_info['status'] != 'active':
+            return jsonify({'success': False, 'error': 'Round is not active'}), 400
+        
+        creator_name = get_member_name(round_info['room_id'], user_id)
+        if creator_name is None:
+            return jsonify({'success': False, 'error': 'User not a member of this room'}), 403
+        
+        # Validate every entry before inserting any, so one bad entry can't
+        # write garbage or fail the transaction halfway
+        errors = []
+        for index, item in enumerate(items):
+            item_error = batch_task_error(item)
+            if item_error:
+                errors.append({'index': index, 'error': item_error})
+        if errors:
+            return jsonify({
+                'success': False,
+                'error': f"Invalid task at index {errors[0]['index']}: {errors[0]['error']}",
+                'errors': errors
+            }), 400
+        
+        results = []
+        created = []
+        created_at = datetime.utcnow()
+        for index, item in enumerate(items):
+            task = Task(
+                round_id=round_id,
+                creator_id=user_id,
+                template=item['template_type'],
+                title=item['title'],
+                description=item.get('description', ''),
+                points=item.get('points', 25),
+                created_at=created_at
+            )
+            created.append(task)
+            results.append({'index': index, 'success': True, 'task': task})
+        
+        rejected = require_active_round(round_id)
+        if rejected:
+            return rejected
+        
+        db.session.add_all(created)
+        apply_task_scores([(task, (0.0, 0)) for task in created])
+        db.session.flush()
+        created_ids = [task.id for task in created]
+        db.session.commit()
+        
+        # Refresh the expired batch with one query rather than one per task
+        Task.query.filter(Task.id.in_(created_ids)).all()
+        
+        for result in results:
+            if result['success']:
+                task = result['task']
+                result['task'] = task_summary(task, creator_name)
+                events.task_created(task, round_info['room_id'], creator_name)
+        
+        return jsonify({
+            'success': True,
+            'created': len(created),
+            'results': results
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def record_proof(task, proof_url, proof_type):
+    """Attach proof to a task, commit and announce it"""
+    task.proof_url = proof_url
+    task.proof_type = proof_type
+    # Variants of a replaced proof are stale; new ones are rendered below for images
+    task.proof_thumbnail_url = None
+    task.proof_display_url = None
+    task.completed_at = datetime.utcnow()
+    
+    db.session.commit()
+    
+    events.task_completed(task, get_round_info(task.round_id)['room_id'])
+    if proof_type in PROOF_EXTENSIONS:
+        thumbnail_pipeline.submit(task.id, proof_url)
+
+@tasks_bp.route('/tasks/<task_id>/proof', methods=['POST'])
+def upload_proof(task_id):
+    """Upload proof of task completion.
+
+    Accepts multipart/form-data (proof_type plus a `file` part, streamed to
+    disk) or JSON with proof_url/proof_type. Base64 `proof_data` in JSON is
+    still accepted for older clients but is capped by MAX_REQUEST_BYTES.
+    """
+    try:
+        if request.mimetype == 'multipart/form-data':
+            data = request.form
+            proof_file = request.files.get('file')
+        else:
+            data = request.get_json()
+            proof_file = None
+        
         proof_url = data.get('proof_url', '')
         proof_type = data.get('proof_type', 'text')
         proof_data = data.get('proof_data', '')  # For base64 encoded files
@@ -250,33 +497,35 @@ def upload_proof():
         if task.approved is not None:
             return jsonify({'success': False, 'error': 'Task already processed'}), 400
         
-        # Handle file upload if proof_data is provided
-        if proof_data and proof_type in ['photo', 'screenshot']:
+        if get_round_info(task.round_id)['status'] != 'active':
+            return jsonify({'success': False, 'error': 'Round is not active'}), 400
+        
+        # Handle file upload if a file part or proof_data is provided; the file
+        # is staged and only stored once the round check below passes
+        staged = None
+        if (proof_file or proof_data) and proof_type in PROOF_EXTENSIONS:
             try:
-                # Create uploads directory if it doesn't exist
-                upload_dir = os.path.join(os.path.dirname(__file__), '..', 'static', 'uploads')
-                os.makedirs(upload_dir, exist_ok=True)
-                
-                # Decode base64 and save file
-                file_data = base64.b64decode(proof_data.split(',')[1] if ',' in proof_data else proof_data)
-                file_extension = 'jpg' if proof_type == 'photo' else 'png'
-                filename = f"proof_{task_id}_{int(datetime.utcnow().timestamp())}.{file_extension}"
-                file_path = os.path.join(upload_dir, filename)
-                
-                with open(file_path, 'wb') as f:
-                    f.write(file_data)
-                
-                proof_url = f"/uploads/{filename}"
-                
+                if proof_file:
+                    staged = stage_proof_stream(proof_type, proof_file.stream)
+                else:
+                    file_data = base64.b64decode(proof_data.split(',')[1] if ',' in proof_data else proof_data)
+                    staged = stage_proof_bytes(proof_type, file_data)
+            except UploadTooLarge as e:
+                return jsonify({'success': False, 'error': str(e)}), 413
+            except EmptyUpload as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
             except Exception as e:
                 return jsonify({'success': False, 'error': f'File upload failed: {str(e)}'}), 500
         
-        # Update task with proof
-        task.proof_url = proof_url
-        task.proof_type = proof_type
-        task.completed_at = datetime.utcnow()
+        rejected = require_active_round(task.round_id)
+        if rejected:
+            if staged:
+                discard_staged(staged)
+            return rejected
         
-        db.session.commit()
+        if staged:
+            proof_url = store_staged(staged)
+        record_proof(task, proof_url, proof_type)
         
         return jsonify({
             'success': True,
@@ -287,11 +536,93 @@ def upload_proof():
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@tasks_bp.route('/tasks/<task_id>/proof/upload', methods=['GET'])
+def get_proof_upload(task_id):
+    """Get the current offset of a resumable proof upload"""
+    try:
+        task = Task.query.get(task_id)
+        if not task:
+            return jsonify({'success': False, 'error': 'Task not found'}), 404
+        
+        return jsonify({
+            'success': True,
+            'offset': upload_offset(task_id),
+            'max_bytes': PROOF_MAX_BYTES
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@tasks_bp.route('/tasks/<task_id>/proof/upload', methods=['PATCH'])
+def upload_proof_chunk(task_id):
+    """Append a raw chunk to a resumable proof upload.
+
+    Query parameters: offset (bytes already sent, must match the server's
+    offset), proof_type (photo/screenshot) and complete=1 on the last chunk,
+    which stores the file and attaches it to the task as proof.
+    """
+    try:
+        offset = request.args.get('offset', type=int)
+        proof_type = request.args.get('proof_type', 'photo')
+        complete = request.args.get('complete') in ('1', 'true')
+        
+        if offset is None or offset < 0:
+            return jsonify({'success': False, 'error': 'A non-negative offset is required'}), 400
+        
+        if proof_type not in PROOF_EXTENSIONS:
+            return jsonify({'success': False, 'error': 'Invalid proof type for file upload'}), 400
+        
+        task = Task.query.get(task_id)
+        if not task:
+            return jsonify({'success': False, 'error': 'Task not found'}), 404
+        
+        if task.approved is not None:
+            return jsonify({'success': False, 'error': 'Task already processed'}), 400
+        
+        if get_round_info(task.round_id)['status'] != 'active':
+            return jsonify({'success': False, 'error': 'Round is not active'}), 400
+        
+        try:
+            new_offset = append_chunk(task_id, offset, request.stream)
+        except UploadOffsetMismatch as e:
+            return jsonify({'success': False, 'error': str(e), 'offset': e.expected}), 409
+        except UploadTooLarge as e:
+            return jsonify({'success': False, 'error': str(e), 'offset': offset}), 413
+        
+        if not complete:
+            return jsonify({
+                'success': True,
+                'offset': new_offset
+            }), 200
+        
+        # Check the round before finalizing consumes the partial upload, so a
+        # rejected request leaves it in place
+        rejected = require_active_round(task.round_id)
+        if rejected:
+            return rejected
+        
+        try:
+            proof_url = finalize_upload(task_id, proof_type)
+        except EmptyUpload as e:
+            db.session.rollback()
+            return jsonify({'success': False, 'error': str(e), 'offset': 0}), 400
+        
+        record_proof(task, proof_url, proof_type)
+        
+        return jsonify({
+            'success': True,
+            'offset': new_offset,
+            'task': task.to_dict()
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @tasks_bp.route('/tasks/<task_id>/approve', methods=['POST'])
-def approve_task():
+def approve_task(task_id):
     """Approve or reject a task"""
     try:
-        task_id = request.view_args['task_id']
         data = request.get_json()
         
         approver_id = data.get('approver_id')
@@ -302,9 +633,9 @@ def approve_task():
             return jsonify({'success': False, 'error': 'Task not found'}), 404
         
         # Verify approver is a member of the room (but not the task creator)
-        round_obj = Round.query.get(task.round_id)
-        member = RoomMember.query.filter_by(room_id=round_obj.room_id, user_id=approver_id).first()
-        if not member:
+        room_id = get_round_info(task.round_id)['room_id']
+        approver_name = get_member_name(room_id, approver_id)
+        if approver_name is None:
             return jsonify({'success': False, 'error': 'User not authorized to approve tasks in this room'}), 403
         
         if approver_id == task.creator_id:
@@ -314,8 +645,16 @@ def approve_task():
         if not task.proof_url and not task.proof_type:
             return jsonify({'success': False, 'error': 'Task has no proof to approve'}), 400
         
-        # Update task approval status
-        task.approved = approve
+        rejected = require_active_round(task.round_id)
+        if rejected:
+            return rejected
+        
+        # Update task approval status, checked against concurrent reviews
+        previous_score = update_task_approval(task, approve)
+        if previous_score is None:
+            db.session.rollback()
+            return jsonify({'success': False, 'error': 'Task is being reviewed concurrently, try again'}), 409
+        apply_task_score(task, previous_score)
         
         # Create vote record
         vote = Vote(
@@ -329,6 +668,8 @@ def approve_task():
         db.session.add(vote)
         db.session.commit()
         
+        events.task_approved(task, room_id, approver_id, approver_name)
+        
         return jsonify({
             'success': True,
             'task': task.to_dict(),
@@ -339,11 +680,115 @@ def approve_task():
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@tasks_bp.route('/rounds/<round_id>/tasks/approve', methods=['POST'])
+def approve_tasks_batch(round_id):
+    """Approve or reject several tasks of a round in a single transaction"""
+    try:
+        data = request.get_json()
+        
+        approver_id = data.get('approver_id')
+        default_approve = data.get('approve', True)
+        
+        items, error = batch_items(data, 'decisions')
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+        
+        round_info = get_round_info(round_id)
+        if not round_info:
+            return jsonify({'success': False, 'error': 'Round not found'}), 404
+        
+        # Verify approver is a member of the room, once for the whole batch
+        room_id = round_info['room_id']
+        approver_name = get_member_name(room_id, approver_id)
+        if approver_name is None:
+            return jsonify({'success': False, 'error': 'User not authorized to approve tasks in this room'}), 403
+        
+        rejected = require_active_round(round_id)
+        if rejected:
+            return rejected
+        
+        task_ids = [item.get('task_id') for item in items]
+        valid_ids = [task_id for task_id in task_ids if isinstance(task_id, str)]
+        tasks = {
+            task.id: task
+            for task in Task.query.filter(Task.round_id == round_id, Task.id.in_(valid_ids))
+        }
+        
+        results = []
+        changes = []
+        votes = []
+        seen = set()
+        for task_id, item in zip(task_ids, items):
+            approve = item.get('approve', default_approve)
+            task = tasks.get(task_id) if isinstance(task_id, str) else None
+            if not isinstance(task_id, str):
+                error = 'task_id must be a string'
+            elif not isinstance(approve, bool):
+                error = 'approve must be true or false'
+            elif not task:
+                error = 'Task not found in this round'
+            elif task_id in seen:
+                error = 'Task appears more than once in this batch'
+            elif approver_id == task.creator_id:
+                error = 'Cannot approve your own task'
+            elif not task.proof_url and not task.proof_type:
+                error = 'Task has no proof to approve'
+            else:
+                error = None
+            
+            if error:
+                results.append({'task_id': task_id, 'success': False, 'error': error})
+                continue
+            seen.add(task_id)
+            
+            previous_score = update_task_approval(task, approve)
+            if previous_score is None:
+                results.append({'task_id': task_id, 'success': False, 'error': 'Task is being reviewed concurrently, try again'})
+                continue
+            changes.append((task, previous_score))
+            
+            vote = Vote(
+                round_id=round_id,
+                voter_id=approver_id,
+                task_id=task_id,
+                vote=approve,
+                vote_type='approval'
+            )
+            votes.append(vote)
+            results.append({'task_id': task_id, 'success': True, 'task': task, 'vote': vote})
+        
+        # One score increment per creator and one leaderboard push for the batch
+        apply_task_scores(changes)
+        db.session.add_all(votes)
+        db.session.flush()
+        vote_ids = [vote.id for vote in votes]
+        db.session.commit()
+        
+        # Refresh the expired batch with one query per table rather than per item
+        Task.query.filter(Task.id.in_(seen)).all()
+        Vote.query.filter(Vote.id.in_(vote_ids)).all()
+        
+        for result in results:
+            if result['success']:
+                task = result['task']
+                result['task'] = task.to_dict()
+                result['vote'] = result['vote'].to_dict()
+                events.task_approved(task, room_id, approver_id, approver_name)
+        
+        return jsonify({
+            'success': True,
+            'processed': len(votes),
+            'results': results
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @tasks_bp.route('/tasks/<task_id>/flag', methods=['POST'])
-def flag_task():
+def flag_task(task_id):
     """Flag a task as too easy or invalid"""
     try:
-        task_id = request.view_args['task_id']
         data = request.get_json()
         
         flagger_id = data.get('flagger_id')
@@ -353,34 +798,53 @@ def flag_task():
             return jsonify({'success': False, 'error': 'Task not found'}), 404
         
         # Verify flagger is a member of the room
-        round_obj = Round.query.get(task.round_id)
-        member = RoomMember.query.filter_by(room_id=round_obj.room_id, user_id=flagger_id).first()
-        if not member:
+        room_id = get_round_info(task.round_id)['room_id']
+        flagger_name = get_member_name(room_id, flagger_id)
+        if flagger_name is None:
             return jsonify({'success': False, 'error': 'User not authorized to flag tasks in this room'}), 403
         
         # Check if task is approved
         if not task.approved:
             return jsonify({'success': False, 'error': 'Can only flag approved tasks'}), 400
         
-        # Check if user already flagged this task
-        existing_flag = Vote.query.filter_by(
-            task_id=task_id,
+        rejected = require_active_round(task.round_id)
+        if rejected:
+            return rejected
+        
+        # Record the flag; the unique index turns away a second flag by the same user
+        flag = Vote(
+            round_id=task.round_id,
             voter_id=flagger_id,
-            vote_type='flag_validation'
-        ).first()
+            task_id=task_id,
+            vote=False,
+            vote_type='flag'
+        )
         
-        if existing_flag:
+        db.session.add(flag)
+        try:
+            db.session.flush()
+        except IntegrityError as e:
+            db.session.rollback()
+            if not is_unique_violation(e, 'uq_vote_flag'):
+                raise
             return jsonify({'success': False, 'error': 'Task already flagged by this user'}), 400
         
-        # Increment flag count
-        task.flagged_count += 1
+        # Increment the flag count in place, so concurrent flags are all counted
+        flagged_count = db.session.execute(
+            update(Task).where(Task.id == task_id).values(
+                flagged_count=Task.flagged_count + 1
+            ).returning(Task.flagged_count),
+            execution_options={'synchronize_session': False}
+        ).scalar_one()
         
         db.session.commit()
         
+        events.task_flagged(task, room_id, flagger_id, flagger_name)
+        
         return jsonify({
             'success': True,
             'task': task.to_dict(),
-            'flagged_count': task.flagged_count
+            'flagged_count': flagged_count
         }), 200
         
     except Exception as e:
@@ -388,40 +852,36 @@ def flag_task():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @tasks_bp.route('/tasks/<task_id>/vote', methods=['POST'])
-def vote_on_flag():
+def vote_on_flag(task_id):
     """Vote on whether a flagged task is valid or invalid"""
     try:
-        task_id = request.view_args['task_id']
         data = request.get_json()
         
         voter_id = data.get('voter_id')
         vote_value = data.get('vote')  # True = valid, False = invalid
         
+        if not isinstance(vote_value, bool):
+            return jsonify({'success': False, 'error': 'vote must be true or false'}), 400
+        
         task = Task.query.get(task_id)
         if not task:
             return jsonify({'success': False, 'error': 'Task not found'}), 404
         
         # Verify voter is a member of the room
-        round_obj = Round.query.get(task.round_id)
-        member = RoomMember.query.filter_by(room_id=round_obj.room_id, user_id=voter_id).first()
-        if not member:
+        room_id = get_round_info(task.round_id)['room_id']
+        voter_name = get_member_name(room_id, voter_id)
+        if voter_name is None:
             return jsonify({'success': False, 'error': 'User not authorized to vote in this room'}), 403
         
         # Check if task is flagged
         if task.flagged_count == 0:
             return jsonify({'success': False, 'error': 'Task is not flagged for voting'}), 400
         
-        # Check if user already voted on this flag
-        existing_vote = Vote.query.filter_by(
-            task_id=task_id,
-            voter_id=voter_id,
-            vote_type='flag_validation'
-        ).first()
-        
-        if existing_vote:
-            return jsonify({'success': False, 'error': 'User already voted on this task'}), 400
+        rejected = require_active_round(task.round_id)
+        if rejected:
+            return rejected
         
-        # Create vote
+        # Record the vote; the unique index turns away a second vote by the same user
         vote = Vote(
             round_id=task.round_id,
             voter_id=voter_id,
@@ -431,30 +891,33 @@ def vote_on_flag():
         )
         
         db.session.add(vote)
+        try:
+            db.session.flush()
+        except IntegrityError as e:
+            db.session.rollback()
+            if not is_unique_violation(e, 'uq_vote_flag_validation'):
+                raise
+            return jsonify({'success': False, 'error': 'User already voted on this task'}), 400
         
-        # Check if we have enough votes to make a decision
-        total_members = RoomMember.query.filter_by(room_id=round_obj.room_id).count()
-        flag_votes = Vote.query.filter_by(task_id=task_id, vote_type='flag_validation').count() + 1  # +1 for current vote
-        
-        # If majority of room members have voted
-        if flag_votes >= (total_members // 2 + 1):
-            # Count invalid votes
-            invalid_votes = Vote.query.filter_by(
-                task_id=task_id,
-                vote_type='flag_validation',
-                vote=False
-            ).count()
-            
-            if not vote_value:  # Current vote is invalid
-                invalid_votes += 1
-            
-            # If majority thinks it's invalid, mark task as not approved
-            if invalid_votes > (flag_votes // 2):
-                task.approved = False
-                task.points = 0  # Remove points
+        # Count it in the task's running tallies with one atomic increment; the
+        # returned totals include every vote committed before this one
+        flag_votes, invalid_votes = db.session.execute(
+            update(Task).where(Task.id == task_id).values(
+                flag_votes=Task.flag_votes + 1,
+                flag_votes_invalid=Task.flag_votes_invalid + (0 if vote_value else 1)
+            ).returning(Task.flag_votes, Task.flag_votes_invalid),
+            execution_options={'synchronize_session': False}
+        ).one()
+        
+        # Once a majority of the room has voted, a majority of invalid votes revokes the task
+        total_members = len(get_room_members(room_id))
+        if flag_votes >= (total_members // 2 + 1) and invalid_votes > (flag_votes // 2):
+            revoke_task_points(task)
         
         db.session.commit()
         
+        events.flag_vote_cast(task, room_id, voter_id)
+        
         return jsonify({
             'success': True,
             'task': task.to_dict(),
@@ -466,22 +929,26 @@ def vote_on_flag():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @tasks_bp.route('/rounds/<round_id>/pending-approvals', methods=['GET'])
+@versioned('round:{round_id}:tasks')
 def get_pending_approvals(round_id):
     """Get tasks pending approval for a round"""
     try:
-        round_obj = Round.query.get(round_id)
-        if not round_obj:
+        if not get_round_info(round_id):
             return jsonify({'success': False, 'error': 'Round not found'}), 404
         
+        # Point list views at thumbnails unless another variant is asked for
+        serializer = task_preview_serializer(request.args.get('proof_variant', 'thumbnail'))
+        
         # Get tasks with proof but no approval decision
-        pending_tasks = Task.query.filter_by(
-            round_id=round_id,
-            approved=None
+        pending_tasks = serializer.select().outerjoin(
+            User, Task.creator_id == User.id
         ).filter(
+            Task.round_id == round_id,
+            Task.approved.is_(None),
             Task.proof_url != ''
         ).order_by(Task.completed_at.asc()).all()
         
-        tasks_data = [task.to_dict() for task in pending_tasks]
+        tasks_data = serializer.to_dicts(pending_tasks)
         
         return jsonify({
             'success': True,
@@ -492,32 +959,24 @@ def get_pending_approvals(round_id):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @tasks_bp.route('/rounds/<round_id>/flagged-tasks', methods=['GET'])
+@versioned('round:{round_id}:tasks')
 def get_flagged_tasks(round_id):
     """Get flagged tasks for voting"""
     try:
-        round_obj = Round.query.get(round_id)
-        if not round_obj:
+        if not get_round_info(round_id):
             return jsonify({'success': False, 'error': 'Round not found'}), 404
         
-        # Get approved tasks that have been flagged
-        flagged_tasks = Task.query.filter_by(
-            round_id=round_id,
-            approved=True
+        # Get approved tasks that have been flagged, with creators and vote tallies
+        serializer = flagged_task_serializer(request.args.get('proof_variant', 'thumbnail'))
+        flagged_tasks = serializer.select().outerjoin(
+            User, Task.creator_id == User.id
         ).filter(
+            Task.round_id == round_id,
+            Task.approved == True,
             Task.flagged_count > 0
         ).order_by(Task.flagged_count.desc()).all()
         
-        tasks_data = []
-        for task in flagged_tasks:
-            task_data = task.to_dict()
-            # Add vote counts
-            flag_votes = Vote.query.filter_by(task_id=task.id, vote_type='flag_validation').all()
-            task_data['flag_votes'] = {
-                'total': len(flag_votes),
-                'valid': len([v for v in flag_votes if v.vote]),
-                'invalid': len([v for v in flag_votes if not v.vote])
-            }
-            tasks_data.append(task_data)
+        tasks_data = serializer.to_dicts(flagged_tasks)
         
         return jsonify({
             'success': True,
@@ -0,0 +1,178 @@
+from sqlalchemy import func
+from src.models.user import db, User, RoomMember, Round, Task, RoundResult, RoomStanding
+
+# Row serializers for list endpoints. Each response shape is declared once as
+# output key -> column; the query selects exactly those columns and rows are
+# turned into dicts by position, so no ORM objects are hydrated and no
+# relationship is lazy-loaded. Datetimes are left as datetime objects for the
+# JSON provider to encode (see src/json_provider.py).
+
+class RowSerializer:
+    """Builds response dicts from rows of selected columns.
+
+    Keys of the form 'parent.child' are nested under 'parent'; a nested dict
+    is None when its first column is NULL (e.g. an outer-joined user that
+    does not exist).
+    """
+
+    def __init__(self, columns):
+        self.columns = tuple(columns.values())
+        flat = []
+        nested = {}
+        for index, key in enumerate(columns):
+            parent, _, child = key.partition('.')
+            if child:
+                nested.setdefault(parent, []).append((child, index))
+            else:
+                flat.append((key, index))
+        self.flat = tuple(flat)
+        self.nested = tuple((parent, tuple(fields)) for parent, fields in nested.items())
+
+    def select(self):
+        """Query selecting this serializer's columns"""
+        return db.session.query(*self.columns)
+
+    def to_dict(self, row):
+        """Response dict for one row"""
+        data = {key: row[index] for key, index in self.flat}
+        for parent, fields in self.nested:
+            if row[fields[0][1]] is None:
+                data[parent] = None
+            else:
+                data[parent] = {child: row[index] for child, index in fields}
+        return data
+
+    def to_dicts(self, rows):
+        """Response dicts for a list of rows"""
+        return [self.to_dict(row) for row in rows]
+
+def user_columns(prefix):
+    """User.to_dict() columns nested under `prefix`"""
+    return {
+        f'{prefix}.id': User.id,
+        f'{prefix}.name': User.name,
+        f'{prefix}.avatar': User.avatar,
+        f'{prefix}.created_at': User.created_at
+    }
+
+PROOF_VARIANTS = ('thumbnail', 'display', 'original')
+
+def proof_preview_column(variant):
+    """SQL equivalent of Task.proof_preview_url(variant)"""
+    if variant == 'thumbnail':
+        return func.coalesce(func.nullif(Task.proof_thumbnail_url, ''), Task.proof_url)
+    if variant == 'display':
+        return func.coalesce(func.nullif(Task.proof_display_url, ''), Task.proof_url)
+    return Task.proof_url
+
+# Task.to_dict() shape; join User on Task.creator_id
+TASK_COLUMNS = {
+    'id': Task.id,
+    'round_id': Task.round_id,
+    'creator_id': Task.creator_id,
+    'template': Task.template,
+    'title': Task.title,
+    'description': Task.description,
+    'target': Task.target,
+    'target_unit': Task.target_unit,
+    'proof_url': Task.proof_url,
+    'proof_type': Task.proof_type,
+    'proof_thumbnail_url': Task.proof_thumbnail_url,
+    'proof_display_url': Task.proof_display_url,
+    'approved': Task.approved,
+    'points': Task.points,
+    'difficulty_multiplier': Task.difficulty_multiplier,
+    'flagged_count': Task.flagged_count,
+    'created_at': Task.created_at,
+    'completed_at': Task.completed_at,
+    **user_columns('creator')
+}
+
+def task_summary_columns(variant):
+    """Compact round task list shape (see routes.tasks.task_summary)"""
+    return {
+        'id': Task.id,
+        'round_id': Task.round_id,
+        'creator_id': Task.creator_id,
+        'template': Task.template,
+        'title': Task.title,
+        'description': Task.description,
+        'points': Task.points,
+        'approved': Task.approved,
+        'proof_url': Task.proof_url,
+        'proof_type': Task.proof_type,
+        'proof_preview_url': proof_preview_column(variant),
+        'flagged_count': Task.flagged_count,
+        'created_at': Task.created_at,
+        'user.name': User.name
+    }
+
+def task_preview_columns(variant):
+    """Task.to_dict() shape plus proof_preview_url"""
+    return {**TASK_COLUMNS, 'proof_preview_url': proof_preview_column(variant)}
+
+def flagged_task_columns(variant):
+    """Task preview shape plus the task's running flag vote tallies"""
+    return {
+        **task_preview_columns(variant),
+        'flag_votes.total': Task.flag_votes,
+        'flag_votes.valid': Task.flag_votes - Task.flag_votes_invalid,
+        'flag_votes.invalid': Task.flag_votes_invalid
+    }
+
+TASK_SUMMARY_SERIALIZERS = {variant: RowSerializer(task_summary_columns(variant)) for variant in PROOF_VARIANTS}
+TASK_PREVIEW_SERIALIZERS = {variant: RowSerializer(task_preview_columns(variant)) for variant in PROOF_VARIANTS}
+FLAGGED_TASK_SERIALIZERS = {variant: RowSerializer(flagged_task_columns(variant)) for variant in PROOF_VARIANTS}
+
+def task_summary_serializer(variant):
+    """Round task list serializer for a proof variant (unknown variants use the original)"""
+    return TASK_SUMMARY_SERIALIZERS.get(variant, TASK_SUMMARY_SERIALIZERS['original'])
+
+def task_preview_serializer(variant):
+    """Task serializer with proof_preview_url for a proof variant"""
+    return TASK_PREVIEW_SERIALIZERS.get(variant, TASK_PREVIEW_SERIALIZERS['original'])
+
+def flagged_task_serializer(variant):
+    """Flagged task list serializer for a proof variant"""
+    return FLAGGED_TASK_SERIALIZERS.get(variant, FLAGGED_TASK_SERIALIZERS['original'])
+
+# RoomMember.to_dict() shape; join User on RoomMember.user_id
+MEMBER_SERIALIZER = RowSerializer({
+    'id': RoomMember.id,
+    'room_id': RoomMember.room_id,
+    'user_id': RoomMember.user_id,
+    'joined_at': RoomMember.joined_at,
+    'is_host': RoomMember.is_host,
+    **user_columns('user')
+})
+
+# Round.to_dict() shape
+ROUND_SERIALIZER = RowSerializer({
+    'id': Round.id,
+    'room_id': Round.room_id,
+    'start_at': Round.start_at,
+    'end_at': Round.end_at,
+    'stakes': Round.stakes,
+    'status': Round.status,
+    'created_at': Round.created_at
+})
+
+# Round winners for the room round history; join User on RoundResult.user_id
+WINNER_SERIALIZER = RowSerializer({
+    'round_id': RoundResult.round_id,
+    'user_id': RoundResult.user_id,
+    'user_name': User.name,
+    'total_points': RoundResult.total_points,
+    'task_count': RoundResult.task_count
+})
+
+# RoomStanding.to_dict() shape with user details; join User on RoomStanding.user_id
+STANDING_SERIALIZER = RowSerializer({
+    'user_id': RoomStanding.user_id,
+    'total_points': RoomStanding.total_points,
+    'task_count': RoomStanding.task_count,
+    'rounds_played': RoomStanding.rounds_played,
+    'rounds_won': RoomStanding.rounds_won,
+    'podiums': RoomStanding.podiums,
+    **user_columns('user')
+})
@@ -0,0 +1,73 @@
+import os
+
+# Which server runs the app. 'threading' is the Werkzeug development server
+# (one OS thread per connection); 'gevent' is a cooperative server where each
+# socket costs a few KiB of greenlet stack, so one process can hold tens of
+# thousands of idle connections. It also moves image transcoding off the
+# event loop (see offload()).
+#
+# Database calls run on the request's greenlet, so gevent needs a cooperative
+# database driver: PostgreSQL through psycopg2, made cooperative by
+# psycogreen in patch_stdlib(). The sqlite3 driver would block the hub for
+# every query, including waits of up to busy_timeout for the write lock,
+# stalling every socket in the process; check_database() refuses to start
+# that combination, so SQLite runs in threading mode only.
+#
+# This module is imported by main.py before anything else: cooperative
+# servers have to patch the standard library before other modules grab
+# references to threading, socket and friends. Keep its imports stdlib only.
+SERVER_MODE = os.environ.get('SERVER_MODE', 'threading')
+SERVER_MODES = ('threading', 'gevent')
+
+# Whether psycopg2 was made cooperative by patch_stdlib()
+psycopg_patched = False
+
+def patch_stdlib(mode=SERVER_MODE):
+    """Monkey patch the standard library for a cooperative server mode"""
+    if mode not in SERVER_MODES:
+        raise ValueError(f'Unknown server mode: {mode}')
+    if mode == 'gevent':
+        from gevent import monkey
+        monkey.patch_all()
+        patch_psycopg()
+
+def patch_psycopg():
+    """Make psycopg2 wait for the database cooperatively, if it is installed"""
+    global psycopg_patched
+    try:
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+        psycopg_patched = True
+    except ImportError:  # psycopg2 is only needed for PostgreSQL; check_database() decides
+        pass
+
+def check_database(mode, database_uri):
+    """Refuse a cooperative server mode on a database driver that would block its event loop"""
+    if mode == 'threading':
+        return
+    if not database_uri.startswith('postgresql') or not psycopg_patched:
+        raise ValueError(
+            f'SERVER_MODE={mode} needs PostgreSQL with psycopg2 and psycogreen installed; '
+            'other database drivers block the event loop. Use SERVER_MODE=threading '
+            'with SQLite.'
+        )
+
+def offload(fn, *args, **kwargs):
+    """Run CPU-bound work (image transcoding) on a native thread.
+
+    Under gevent the call is handed to gevent's native thread pool and only
+    the calling greenlet waits; elsewhere it simply runs inline. fn must not
+    touch the ORM, the connection pool or any other lock: after patch_all()
+    those are greenlet primitives, and sharing them between native threads
+    and greenlets deadlocks. Database work
+    runs on the calling greenlet through in_app_context() instead.
+    """
+    if SERVER_MODE == 'gevent':
+        import gevent
+        return gevent.get_hub().threadpool.apply(fn, args, kwargs)
+    return fn(*args, **kwargs)
+
+def in_app_context(app, fn, *args, **kwargs):
+    """Call a function that needs an application context, e.g. from a background task"""
+    with app.app_context():
+        return fn(*args, **kwargs)
@@ -0,0 +1,98 @@
+from concurrent.futures import ThreadPoolExecutor
+import io
+from src.config import THUMBNAIL_MAX_PX, DISPLAY_MAX_PX, THUMBNAIL_QUALITY, DISPLAY_QUALITY
+from src.models.user import db, Task, Round
+from src.versions import touch
+from src.uploads import blob_path_for_url, save_blob_bytes
+from src.server import offload, in_app_context
+from src import events
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; without it proofs are only served full size
+    Image = None
+
+def render_variant(source_path, max_px, quality):
+    """Downscale an image to fit max_px x max_px and re-encode it as JPEG bytes"""
+    with Image.open(source_path) as image:
+        # Let the JPEG decoder skip detail we are about to throw away
+        image.draft('RGB', (max_px, max_px))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_px, max_px))
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        output = io.BytesIO()
+        image.save(output, 'JPEG', quality=quality, optimize=True, progressive=True)
+        return output.getvalue()
+
+class ThumbnailPipeline:
+    """Worker pool that renders thumbnail and display variants of proof images.
+
+    upload_proof submits new photo/screenshot proofs after commit; workers
+    render both variants into the blob store and record their URLs on the
+    task, so the request thread never pays for image transcoding.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.executor = None
+
+    def init_app(self, app, workers=2):
+        """Start the worker pool for an app (no-op without Pillow)"""
+        if Image is None:
+            print('Pillow not installed, proof thumbnails disabled')
+            return
+        self.app = app
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='thumbnails')
+
+    def submit(self, task_id, proof_url):
+        """Queue variant rendering for a task's proof"""
+        if self.executor is None or not blob_path_for_url(proof_url):
+            return
+        self.executor.submit(self.process, task_id, proof_url)
+
+    def shutdown(self):
+        """Finish queued renders and stop the worker pool"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def process(self, task_id, proof_url):
+        """Render variants for one proof and record them on the task"""
+        try:
+            # Decoding and encoding hold the CPU; keep them off the event loop
+            source_path = blob_path_for_url(proof_url)
+            thumbnail_url = offload(self.render, source_path, THUMBNAIL_MAX_PX, THUMBNAIL_QUALITY)
+            display_url = offload(self.render, source_path, DISPLAY_MAX_PX, DISPLAY_QUALITY)
+
+            room_id = in_app_context(self.app, self.record, task_id, proof_url, thumbnail_url, display_url)
+            if room_id:
+                with self.app.app_context():
+                    events.proof_variants_ready(task_id, room_id, thumbnail_url, display_url)
+
+        except Exception as e:
+            print(f'Error rendering proof variants for task {task_id}: {str(e)}')
+
+    def render(self, source_path, max_px, quality):
+        """Render one variant into the blob store and return its URL"""
+        return save_blob_bytes(render_variant(source_path, max_px, quality), 'jpg')
+
+    def record(self, task_id, proof_url, thumbnail_url, display_url):
+        """Store variant URLs on a task; returns its room_id, or None if the proof changed"""
+        # Skip if the proof was replaced while we were rendering
+        updated = Task.query.filter_by(id=task_id, proof_url=proof_url).update({
+            Task.proof_thumbnail_url: thumbnail_url,
+            Task.proof_display_url: display_url
+        })
+        if not updated:
+            db.session.commit()
+            return None
+
+        round_id, room_id = db.session.query(Round.id, Round.room_id).join(Task).filter(Task.id == task_id).one()
+        # Bulk UPDATE skips the flush hooks, so bump the task list version here
+        touch(f'round:{round_id}:tasks')
+        db.session.commit()
+        return room_id
+
+thumbnail_pipeline = ThumbnailPipeline()
@@ -0,0 +1,238 @@
+from contextlib import contextmanager
+import hashlib
+import os
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; partial uploads are then unlocked
+    fcntl = None
+from src.config import PROOF_MAX_BYTES, UPLOAD_CHUNK_SIZE, UPLOAD_DIR
+
+# File extension stored for each file-based proof type
+PROOF_EXTENSIONS = {
+    'photo': 'jpg',
+    'screenshot': 'png'
+}
+
+# Proof files are stored once per distinct content under their SHA-256
+# digest, sharded two levels deep: blobs/ab/cd/abcd...ef.jpg
+BLOB_DIR = os.path.join(UPLOAD_DIR, 'blobs')
+TMP_DIR = os.path.join(UPLOAD_DIR, '.tmp')
+PARTIAL_DIR = os.path.join(UPLOAD_DIR, '.partial')
+PROOF_URL_PREFIX = '/api/proofs/'
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds PROOF_MAX_BYTES"""
+
+class EmptyUpload(Exception):
+    """Raised when a completed upload has no content"""
+
+class UploadOffsetMismatch(Exception):
+    """Raised when a chunk does not start where the stored upload ends"""
+
+    def __init__(self, expected):
+        super().__init__(f'Upload offset mismatch, expected {expected}')
+        self.expected = expected
+
+def copy_stream(stream, f, written=0, limit=PROOF_MAX_BYTES, hasher=None):
+    """Copy a readable stream into an open file in fixed-size chunks.
+
+    `written` is the number of bytes already in the file; returns the new
+    total. Raises UploadTooLarge as soon as the total passes `limit`, so no
+    more than one chunk is ever held in memory. Chunks are fed to `hasher`
+    when given.
+    """
+    while True:
+        chunk = stream.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            return written
+        written += len(chunk)
+        if written > limit:
+            raise UploadTooLarge(f'Upload exceeds {limit} bytes')
+        if hasher:
+            hasher.update(chunk)
+        f.write(chunk)
+
+def file_digest(path):
+    """SHA-256 hex digest of a file, read in chunks"""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def blob_path(digest, extension):
+    """Sharded on-disk location of a blob"""
+    return os.path.join(BLOB_DIR, digest[:2], digest[2:4], f"{digest}.{extension}")
+
+def proof_url_for(digest, extension):
+    """Public URL of a stored proof blob"""
+    return f"{PROOF_URL_PREFIX}{digest}.{extension}"
+
+def store_blob(temp_path, digest, extension):
+    """Move a fully written temp file into the blob store and return its URL.
+
+    If a blob with the same content already exists the temp file is dropped,
+    so identical uploads share one file.
+    """
+    path = blob_path(digest, extension)
+    if os.path.exists(path):
+        os.remove(temp_path)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(temp_path, path)
+    return proof_url_for(digest, extension)
+
+# Proof uploads are staged: the file is written to a temp file and hashed
+# first, and only moved into the blob store (store_staged) once the request is
+# known to succeed. A rejected request discards the temp file, never a blob
+# that other tasks may share.
+
+def write_temp(data):
+    """Write bytes to a new temp file and return its path"""
+    os.makedirs(TMP_DIR, exist_ok=True)
+    temp_path = os.path.join(TMP_DIR, uuid.uuid4().hex)
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    return temp_path
+
+def stage_proof_stream(proof_type, stream):
+    """Stream an uploaded file into a temp file; returns (temp_path, digest, extension)"""
+    os.makedirs(TMP_DIR, exist_ok=True)
+    temp_path = os.path.join(TMP_DIR, uuid.uuid4().hex)
+    hasher = hashlib.sha256()
+
+    try:
+        with open(temp_path, 'wb') as f:
+            if not copy_stream(stream, f, hasher=hasher):
+                raise EmptyUpload('Upload is empty')
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return temp_path, hasher.hexdigest(), PROOF_EXTENSIONS[proof_type]
+
+def stage_proof_bytes(proof_type, data):
+    """Stage an already decoded proof file; returns (temp_path, digest, extension)"""
+    if len(data) > PROOF_MAX_BYTES:
+        raise UploadTooLarge(f'Upload exceeds {PROOF_MAX_BYTES} bytes')
+    if not data:
+        raise EmptyUpload('Upload is empty')
+
+    return write_temp(data), hashlib.sha256(data).hexdigest(), PROOF_EXTENSIONS[proof_type]
+
+def store_staged(staged):
+    """Move a staged proof into the blob store and return its proof URL"""
+    return store_blob(*staged)
+
+def discard_staged(staged):
+    """Delete a staged proof that will not be stored"""
+    temp_path, _, _ = staged
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+def save_blob_bytes(data, extension):
+    """Store an in-memory file in the blob store and return its URL"""
+    return store_blob(write_temp(data), hashlib.sha256(data).hexdigest(), extension)
+
+def blob_path_for_url(url):
+    """On-disk path of a blob given its proof URL, or None for other URLs"""
+    if not url or not url.startswith(PROOF_URL_PREFIX):
+        return None
+    digest, _, extension = url[len(PROOF_URL_PREFIX):].partition('.')
+    return blob_path(digest, extension)
+
+# Resumable uploads: chunks are appended to a per-task partial file until the
+# client marks the upload complete. A retry asks for the current offset and
+# resends only the missing tail.
+
+def partial_path(task_id):
+    """Path of the in-progress upload for a task"""
+    return os.path.join(PARTIAL_DIR, f"{task_id}.part")
+
+def upload_offset(task_id):
+    """Number of bytes received so far for a task's resumable upload"""
+    path = partial_path(task_id)
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+@contextmanager
+def locked_partial(task_id):
+    """Open a task's partial upload for appending under an exclusive lock.
+
+    Concurrent requests for the same task (a client retrying a chunk it
+    thinks was lost) queue on the lock instead of interleaving writes. If the
+    file was finalized or swept while waiting, the lock is taken again on a
+    fresh file at the same path.
+    """
+    os.makedirs(PARTIAL_DIR, exist_ok=True)
+    path = partial_path(task_id)
+    while True:
+        f = open(path, 'ab')
+        try:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                current = os.path.exists(path) and os.path.samestat(os.fstat(f.fileno()), os.stat(path))
+            except FileNotFoundError:
+                current = False
+            if current:
+                yield f
+                return
+        finally:
+            f.close()
+
+def append_chunk(task_id, offset, stream):
+    """Append a chunk at `offset` to a task's partial upload; returns the new offset"""
+    with locked_partial(task_id) as f:
+        # Checked under the lock, so two chunks sent at the same offset can't both append
+        current = os.fstat(f.fileno()).st_size
+        if offset != current:
+            raise UploadOffsetMismatch(current)
+
+        try:
+            return copy_stream(stream, f, written=current)
+        except UploadTooLarge:
+            f.truncate(current)
+            raise
+
+def finalize_upload(task_id, proof_type):
+    """Move a completed partial upload into the blob store and return its proof URL"""
+    path = partial_path(task_id)
+    with locked_partial(task_id) as f:
+        if not os.fstat(f.fileno()).st_size:
+            os.remove(path)
+            raise EmptyUpload('Upload is empty')
+        return store_blob(path, file_digest(path), PROOF_EXTENSIONS[proof_type])
+
+def sweep_abandoned_uploads(max_age):
+    """Delete partial and temporary upload files untouched for `max_age` seconds"""
+    cutoff = time.time() - max_age
+    removed = 0
+    for directory in (PARTIAL_DIR, TMP_DIR):
+        if not os.path.isdir(directory):
+            continue
+        for entry in os.scandir(directory):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                pass  # finalized or removed while sweeping
+    return removed
+
+def start_upload_sweeper(socketio, max_age, interval):
+    """Sweep abandoned uploads now and then every `interval` seconds"""
+    def run():
+        while True:
+            try:
+                removed = sweep_abandoned_uploads(max_age)
+                if removed:
+                    print(f'Removed {removed} abandoned upload files')
+            except Exception as e:
+                print(f'Error sweeping abandoned uploads: {str(e)}')
+            socketio.sleep(interval)
+
+    socketio.start_background_task(run)
@@ -0,0 +1,144 @@
+import functools
+import hashlib
+from flask import current_app, make_response, request
+from sqlalchemy import event, inspect, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from src.models.user import db, User, RoomMember, Round, RoundScore, Task, Vote
+
+# Per-resource version counters backing ETags on the polled GET endpoints.
+# Every flush that touches a resource's rows bumps its counter in the same
+# transaction, so all workers agree on the current version and an unchanged
+# poll is answered with a 304 after one primary-key lookup.
+
+class ResourceVersion(db.Model):
+    """Change counter for one polled resource, e.g. round:<id>:tasks"""
+    key = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ResourceVersion {self.key} v{self.version}>'
+
+def changed_resources(obj):
+    """Version keys made stale by a change to an ORM object"""
+    if isinstance(obj, Task):
+        return [f'round:{obj.round_id}:tasks', f'round:{obj.round_id}:stats']
+    if isinstance(obj, RoundScore):
+        return [f'round:{obj.round_id}:stats']
+    if isinstance(obj, Vote):
+        return [f'round:{obj.round_id}:tasks']
+    if isinstance(obj, RoomMember):
+        return [f'room:{obj.room_id}:members']
+    if isinstance(obj, Round):
+        return [f'room:{obj.room_id}:rounds']
+    return []
+
+def renamed_user_resources(connection, user):
+    """Version keys of every room and round showing a user whose name or avatar changed"""
+    state = inspect(user)
+    if not any(state.attrs[name].history.has_changes() for name in ('name', 'avatar')):
+        return []
+
+    room_ids = connection.execute(
+        select(RoomMember.room_id).where(RoomMember.user_id == user.id)
+    ).scalars().all()
+    if not room_ids:
+        return []
+    round_ids = connection.execute(
+        select(Round.id).where(Round.room_id.in_(room_ids))
+    ).scalars().all()
+
+    keys = []
+    for room_id in room_ids:
+        keys += [f'room:{room_id}:members', f'room:{room_id}:rounds']
+    for round_id in round_ids:
+        keys += [f'round:{round_id}:tasks', f'round:{round_id}:stats']
+    return keys
+
+def bump_versions(connection, keys):
+    """Increment the counters for a set of keys, creating missing ones.
+
+    Each key is one INSERT ... ON CONFLICT DO UPDATE, so concurrent first
+    writes to the same key cannot both insert and trip the primary key.
+    """
+    insert = postgresql_insert if connection.dialect.name == 'postgresql' else sqlite_insert
+    for key in sorted(keys):
+        statement = insert(ResourceVersion).values(key=key, version=1)
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=[ResourceVersion.key],
+            set_={'version': ResourceVersion.version + 1}
+        ))
+
+def touch(*keys):
+    """Bump versions for a write made without the ORM unit of work (bulk UPDATE).
+
+    Keys are collected on the session and bumped once each when it commits.
+    """
+    db.session.info.setdefault('touched_versions', set()).update(keys)
+
+def get_versions(keys):
+    """Current version of each key (0 for keys never written)"""
+    rows = db.session.query(ResourceVersion.key, ResourceVersion.version).filter(ResourceVersion.key.in_(keys))
+    versions = dict(rows.all())
+    return [versions.get(key, 0) for key in keys]
+
+@event.listens_for(Session, 'after_flush')
+def bump_changed_resources(session, flush_context):
+    """Bump the versions of resources whose rows this flush wrote"""
+    keys = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+            continue
+        keys.update(changed_resources(obj))
+        # Member lists, tasks and standings embed user names and avatars
+        if isinstance(obj, User) and obj in session.dirty:
+            keys.update(renamed_user_resources(session.connection(), obj))
+    if keys:
+        bump_versions(session.connection(), keys)
+
+@event.listens_for(Session, 'before_commit')
+def bump_touched_resources(session):
+    """Bump the versions touched by bulk writes in this transaction"""
+    keys = session.info.pop('touched_versions', None)
+    if keys:
+        bump_versions(session.connection(), keys)
+
+@event.listens_for(Session, 'after_rollback')
+def discard_touched_resources(session):
+    """Nothing was written; forget the touched versions"""
+    session.info.pop('touched_versions', None)
+
+def make_etag(keys, versions):
+    """Weak ETag for a response built from resources at the given versions"""
+    state = '|'.join(f'{key}={version}' for key, version in zip(keys, versions))
+    return hashlib.sha1(f'{state}?{request.query_string.decode()}'.encode()).hexdigest()[:20]
+
+def versioned(*key_templates):
+    """Decorate a GET route with a weak ETag from resource version counters.
+
+    Key templates are formatted with the route's view arguments, e.g.
+    'round:{round_id}:tasks'. A request whose If-None-Match matches the
+    current versions gets an empty 304 without running the view.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(**kwargs):
+            keys = [template.format(**kwargs) for template in key_templates]
+            # Read versions before the data, so a concurrent write can only
+            # make the ETag older than the body, never newer
+            etag = make_etag(keys, get_versions(keys))
+
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(**kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            # Let clients cache the body but revalidate on every poll
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,57 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The app reads its database and upload locations at import time, so point
+# them at a scratch directory before anything imports src.main
+SCRATCH_DIR = tempfile.mkdtemp(prefix='climbclash-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(SCRATCH_DIR, 'test.db')}"
+os.environ['UPLOAD_DIR'] = os.path.join(SCRATCH_DIR, 'uploads')
+os.environ['SERVER_MODE'] = 'threading'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(scope='session')
+def main():
+    """The app module, imported once against the scratch database"""
+    import src.main as main
+    return main
+
+@pytest.fixture
+def app(main):
+    return main.app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def room(client):
+    """A fresh room with a host and one other member"""
+    created = client.post('/api/rooms', json={'name': 'Test Room', 'creator_name': 'Host'}).get_json()
+    joined = client.post('/api/rooms/join', json={'code': created['room']['code'], 'name': 'Member'}).get_json()
+    return {
+        'id': created['room']['id'],
+        'host_id': created['user']['id'],
+        'member_id': joined['user']['id']
+    }
+
+@pytest.fixture
+def active_round(client, room):
+    """An active round in the room"""
+    response = client.post('/api/rounds', json={'room_id': room['id'], 'user_id': room['host_id']})
+    return response.get_json()['round']
+
+@pytest.fixture
+def close_behind_cache(app):
+    """Close a round in the database only, as another worker would, leaving this worker's cache stale"""
+    from src.models.user import db
+
+    def close(round_id):
+        with app.app_context():
+            db.session.execute(
+                db.text("UPDATE round SET status = 'completed' WHERE id = :id"), {'id': round_id}
+            )
+            db.session.commit()
+    return close
@@ -0,0 +1,26 @@
+from src.models.user import db, User
+
+def test_unchanged_poll_gets_304(client, room):
+    url = f"/api/rooms/{room['id']}/members"
+    first = client.get(url)
+    again = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+
+    assert first.status_code == 200
+    assert again.status_code == 304
+
+def test_rename_invalidates_member_and_stats_etags(app, client, room, active_round):
+    members_url = f"/api/rooms/{room['id']}/members"
+    stats_url = f"/api/rounds/{active_round['id']}/stats"
+    members_etag = client.get(members_url).headers['ETag']
+    stats_etag = client.get(stats_url).headers['ETag']
+
+    with app.app_context():
+        db.session.get(User, room['member_id']).name = 'Renamed'
+        db.session.commit()
+
+    members = client.get(members_url, headers={'If-None-Match': members_etag})
+    stats = client.get(stats_url, headers={'If-None-Match': stats_etag})
+
+    assert members.status_code == 200
+    assert 'Renamed' in members.get_data(as_text=True)
+    assert stats.status_code == 200
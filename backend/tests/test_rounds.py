@@ -0,0 +1,81 @@
+import threading
+from datetime import datetime
+
+import src.routes.rounds as rounds_routes
+from src.models.user import db, Round, Task
+
+def test_racing_round_creates_start_one_round(main, app, room, monkeypatch):
+    # Both requests pass the active-round check before either commits
+    barrier = threading.Barrier(2, timeout=10)
+
+    class RacingDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            barrier.wait()
+            return super().utcnow()
+
+    monkeypatch.setattr(rounds_routes, 'datetime', RacingDatetime)
+
+    statuses = []
+    def start_round():
+        response = app.test_client().post('/api/rounds', json={'room_id': room['id'], 'user_id': room['host_id']})
+        statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=start_round) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(statuses) == [201, 400]
+    with app.app_context():
+        assert Round.query.filter_by(room_id=room['id'], status='active').count() == 1
+
+def test_round_create_checks_database_not_cache(client, room, close_behind_cache):
+    first = client.post('/api/rounds', json={'room_id': room['id'], 'user_id': room['host_id']}).get_json()
+    assert first['success']
+
+    # A second round for the same room is refused while the first is active
+    second = client.post('/api/rounds', json={'room_id': room['id'], 'user_id': room['host_id']})
+    assert second.status_code == 400
+
+    # Closed elsewhere: a new round may start even though the cache still has the old one
+    close_behind_cache(first['round']['id'])
+    third = client.post('/api/rounds', json={'room_id': room['id'], 'user_id': room['host_id']})
+    assert third.status_code == 201
+
+def test_task_writes_after_close_are_rejected(app, client, room, active_round, close_behind_cache):
+    round_id = active_round['id']
+    # Fill this worker's round cache with the active status
+    assert client.get(f'/api/rounds/{round_id}').status_code == 200
+    close_behind_cache(round_id)
+
+    simple = client.post('/api/tasks', json={
+        'round_id': round_id, 'user_id': room['member_id'], 'template_type': 'milestone', 'title': 'Simple'
+    })
+    templated = client.post(f'/api/rounds/{round_id}/tasks', json={
+        'creator_id': room['member_id'], 'template': 'milestone', 'target': 2, 'title': 'Templated'
+    })
+    batch = client.post(f'/api/rounds/{round_id}/tasks/batch', json={
+        'user_id': room['member_id'], 'tasks': [{'template_type': 'milestone', 'title': 'Batched'}]
+    })
+
+    assert [simple.status_code, templated.status_code, batch.status_code] == [400, 400, 400]
+    with app.app_context():
+        assert Task.query.filter_by(round_id=round_id).count() == 0
+
+def test_batch_rejects_invalid_entries_by_index(app, client, room, active_round):
+    round_id = active_round['id']
+    response = client.post(f'/api/rounds/{round_id}/tasks/batch', json={
+        'user_id': room['member_id'],
+        'tasks': [
+            {'template_type': 'milestone', 'title': 'Fine'},
+            {'template_type': 'milestone', 'title': 'Bad points', 'points': '9'},
+            {'template_type': 'unknown', 'title': 'Bad template'}
+        ]
+    })
+
+    assert response.status_code == 400
+    assert [error['index'] for error in response.get_json()['errors']] == [1, 2]
+    with app.app_context():
+        assert Task.query.filter_by(round_id=round_id).count() == 0
@@ -0,0 +1,78 @@
+import io
+import os
+import threading
+
+import pytest
+
+from src import uploads
+from src.uploads import append_chunk, finalize_upload, upload_offset, UploadOffsetMismatch
+
+def stored_files():
+    """Every file under the blob store and the temp directory"""
+    found = []
+    for directory in (uploads.BLOB_DIR, uploads.TMP_DIR):
+        for root, _, files in os.walk(directory):
+            found += [os.path.join(root, name) for name in files]
+    return found
+
+@pytest.fixture
+def task(client, room, active_round):
+    response = client.post('/api/tasks', json={
+        'round_id': active_round['id'], 'user_id': room['member_id'],
+        'template_type': 'milestone', 'title': 'Upload me'
+    })
+    return response.get_json()['task']
+
+class SlowStream(io.BytesIO):
+    """A request body that arrives in small, slow pieces"""
+
+    def read(self, size=-1):
+        threading.Event().wait(0.02)
+        return super().read(4)
+
+def test_proof_upload_after_close_leaves_no_blob(client, task, close_behind_cache):
+    before = stored_files()
+    close_behind_cache(task['round_id'])
+
+    response = client.post(
+        f"/api/tasks/{task['id']}/proof",
+        data={'proof_type': 'photo', 'file': (io.BytesIO(b'rejected proof bytes'), 'proof.jpg')},
+        content_type='multipart/form-data'
+    )
+
+    assert response.status_code == 400
+    assert stored_files() == before
+
+def test_chunked_upload_after_close_keeps_partial(client, task, close_behind_cache):
+    url = f"/api/tasks/{task['id']}/proof/upload"
+    first = client.patch(f'{url}?offset=0&proof_type=photo', data=b'first chunk')
+    assert first.get_json()['offset'] == len(b'first chunk')
+
+    close_behind_cache(task['round_id'])
+    last = client.patch(f'{url}?offset={len(b"first chunk")}&proof_type=photo&complete=1', data=b'!')
+
+    assert last.status_code == 400
+    assert upload_offset(task['id']) == len(b'first chunk!')
+
+def test_racing_chunks_at_same_offset_append_once():
+    task_id = 'racing-chunks'
+    results = []
+
+    def send():
+        try:
+            results.append(append_chunk(task_id, 0, SlowStream(b'0123456789')))
+        except UploadOffsetMismatch as e:
+            results.append(('mismatch', e.expected))
+
+    threads = [threading.Thread(target=send) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(10) == 1
+    assert results.count(('mismatch', 10)) == 2
+    with open(uploads.partial_path(task_id), 'rb') as f:
+        assert f.read() == b'0123456789'
+    finalize_upload(task_id, 'photo')
+    assert upload_offset(task_id) == 0
@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+from src.models.user import db, RoundScore, Task, Vote
+
+def create_proven_task(client, room, round_id, title='Proven'):
+    """A member's task with text proof, ready for review"""
+    task = client.post('/api/tasks', json={
+        'round_id': round_id, 'user_id': room['member_id'], 'template_type': 'milestone', 'title': title
+    }).get_json()['task']
+    client.post(f"/api/tasks/{task['id']}/proof", json={'proof_type': 'text', 'proof_url': 'done'})
+    return task
+
+@pytest.fixture
+def approved_task(client, room, active_round):
+    task = create_proven_task(client, room, active_round['id'])
+    client.post(f"/api/tasks/{task['id']}/approve", json={'approver_id': room['host_id']})
+    return task
+
+def test_duplicate_flag_is_turned_away_by_unique_index(app, client, room, approved_task):
+    url = f"/api/tasks/{approved_task['id']}/flag"
+    first = client.post(url, json={'flagger_id': room['host_id']})
+    second = client.post(url, json={'flagger_id': room['host_id']})
+
+    assert first.status_code == 200
+    assert second.status_code == 400
+    assert 'already flagged' in second.get_json()['error']
+    with app.app_context():
+        assert db.session.get(Task, approved_task['id']).flagged_count == 1
+
+def test_duplicate_flag_vote_is_counted_once(app, client, room, approved_task):
+    client.post(f"/api/tasks/{approved_task['id']}/flag", json={'flagger_id': room['host_id']})
+    url = f"/api/tasks/{approved_task['id']}/vote"
+    first = client.post(url, json={'voter_id': room['host_id'], 'vote': False})
+    second = client.post(url, json={'voter_id': room['host_id'], 'vote': True})
+
+    assert first.status_code == 200
+    assert second.status_code == 400
+    assert 'already voted' in second.get_json()['error']
+    with app.app_context():
+        task = db.session.get(Task, approved_task['id'])
+        assert (task.flag_votes, task.flag_votes_invalid) == (1, 1)
+        assert Vote.query.filter_by(task_id=task.id, vote_type='flag_validation').count() == 1
+
+def test_racing_approvals_both_reach_round_score(app, client, room, active_round):
+    tasks = [create_proven_task(client, room, active_round['id'], f'Task {i}') for i in range(2)]
+    barrier = threading.Barrier(2, timeout=10)
+
+    def approve(task):
+        barrier.wait()
+        app.test_client().post(f"/api/tasks/{task['id']}/approve", json={'approver_id': room['host_id']})
+
+    threads = [threading.Thread(target=approve, args=(task,)) for task in tasks]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with app.app_context():
+        score = RoundScore.query.filter_by(round_id=active_round['id'], user_id=room['member_id']).one()
+        points = sum(db.session.get(Task, task['id']).points for task in tasks)
+        assert (score.task_count, score.total_points) == (2, points)
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { BrowserRouter as Router, Routes, Route, Navigate } from 'react-router-dom'
 import { Button } from '@/components/ui/button.jsx'
 import { Card, CardContent, CardDescription, CardHeader, CardTitle, CardFooter } from '@/components/ui/card.jsx'
@@ -12,6 +12,17 @@ import './App.css'
 // API Configuration
 const API_BASE_URL = 'http://localhost:5001/api'
 
+// Proof types stored as images, which get thumbnail and display variants
+const IMAGE_PROOF_TYPES = ['photo', 'screenshot']
+
+// Stored proofs are served by the API under /api/proofs/
+const proofAssetUrl = (url) => url?.startsWith('/') ? new URL(API_BASE_URL).origin + url : url
+
+// Smallest available rendering of a proof, falling back to the original
+// until the thumbnail pipeline has filled the variants in
+const proofPreviewUrl = (task) =>
+  proofAssetUrl(task.proof_thumbnail_url || task.proof_preview_url || task.proof_display_url || task.proof_url)
+
 // Main App Component
 function App() {
   const [user, setUser] = useState(null)
@@ -350,12 +361,6 @@ function RoomDashboard({ user, room, setUser, setRoom }) {
         addNotification(data.message, 'warning')
       })
       
-      // Leaderboard events
-      socket.on('leaderboard_updated', (data) => {
-        console.log('Leaderboard updated:', data)
-        // Could trigger a leaderboard refresh here
-      })
-      
       // Room status events
       socket.on('room_status', (data) => {
         console.log('Room status:', data)
@@ -382,7 +387,6 @@ function RoomDashboard({ user, room, setUser, setRoom }) {
         socket.off('task_completed')
         socket.off('task_approved')
         socket.off('task_flagged')
-        socket.off('leaderboard_updated')
         socket.off('room_status')
         socket.off('error')
       }
@@ -551,6 +555,8 @@ function RoomDashboard({ user, room, setUser, setRoom }) {
           round={activeRound} 
           user={user} 
           room={room}
+          members={members}
+          socket={socket}
           onRoundEnd={() => setActiveRound(null)}
         />
       ) : (
@@ -690,14 +696,13 @@ function StartRoundCard({ user, room, members, onRoundStart }) {
 }
 
 // Round View Component with Task Management
-function RoundView({ round, user, room, onRoundEnd }) {
+function RoundView({ round, user, room, members, socket, onRoundEnd }) {
   const [activeTab, setActiveTab] = useState('tasks')
   const [tasks, setTasks] = useState([])
   const [showCreateTask, setShowCreateTask] = useState(false)
   const [selectedTemplate, setSelectedTemplate] = useState(null)
   const [taskFormData, setTaskFormData] = useState({})
   const [loading, setLoading] = useState(false)
-  const socket = useSocket()
 
   // Goal Templates
   const goalTemplates = [
@@ -796,6 +801,27 @@ function RoundView({ round, user, room, onRoundEnd }) {
     fetchTasks()
   }, [round.id])
 
+  // Downscaled proof images are rendered in the background; patch them in when ready
+  useEffect(() => {
+    if (!socket?.socket) return
+
+    const handleProofVariantsReady = (data) => {
+      setTasks(prev => prev.map(task =>
+        task.id === data.task_id ? {
+          ...task,
+          proof_thumbnail_url: data.proof_thumbnail_url,
+          proof_display_url: data.proof_display_url,
+          proof_preview_url: data.proof_thumbnail_url
+        } : task
+      ))
+    }
+
+    socket.on('proof_variants_ready', handleProofVariantsReady)
+    return () => {
+      socket.off('proof_variants_ready', handleProofVariantsReady)
+    }
+  }, [socket?.socket, round.id])
+
   const fetchTasks = async () => {
     try {
       const response = await fetch(`${API_BASE_URL}/rounds/${round.id}/tasks`)
@@ -843,11 +869,6 @@ function RoundView({ round, user, room, onRoundEnd }) {
         setShowCreateTask(false)
         setSelectedTemplate(null)
         setTaskFormData({})
-        
-        // Broadcast task creation via Socket.io
-        if (socket.isConnected) {
-          socket.broadcastTaskCreated(room.id, data.task)
-        }
       } else {
         alert(data.message || 'Failed to create task')
       }
@@ -888,8 +909,8 @@ function RoundView({ round, user, room, onRoundEnd }) {
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
           proof_type: proofData.type,
-          proof_url: proofData.content,
-          proof_data: proofData.type === 'file' ? proofData.content : null
+          proof_url: IMAGE_PROOF_TYPES.includes(proofData.type) ? '' : proofData.content,
+          proof_data: IMAGE_PROOF_TYPES.includes(proofData.type) ? proofData.content : null
         })
       })
 
@@ -897,14 +918,17 @@ function RoundView({ round, user, room, onRoundEnd }) {
       if (data.success) {
         // Update task in local state
         setTasks(prev => prev.map(task => 
-          task.id === taskId ? { ...task, proof_url: proofData.content } : task
+          task.id === taskId ? {
+            ...task,
+            proof_url: data.task.proof_url,
+            proof_type: data.task.proof_type,
+            // The server drops the old proof's variants; new ones arrive via proof_variants_ready
+            proof_thumbnail_url: null,
+            proof_display_url: null,
+            proof_preview_url: null
+          } : task
         ))
         
-        // Broadcast proof upload via Socket.io
-        if (socket.isConnected) {
-          socket.broadcastProofUploaded(room.id, taskId, proofData)
-        }
-        
         alert('Proof uploaded successfully!')
       } else {
         alert(data.message || 'Failed to upload proof')
@@ -934,10 +958,6 @@ function RoundView({ round, user, room, onRoundEnd }) {
           task.id === taskId ? { ...task, approved: approve } : task
         ))
         
-        // Broadcast approval via Socket.io
-        if (socket.isConnected) {
-          socket.broadcastTaskApproved(room.id, taskId, approve, user.name)
-        }
         
         alert(approve ? 'Task approved!' : 'Task rejected!')
       } else {
@@ -963,11 +983,6 @@ function RoundView({ round, user, room, onRoundEnd }) {
 
       const data = await response.json()
       if (data.success) {
-        // Broadcast flag via Socket.io
-        if (socket.isConnected) {
-          socket.broadcastTaskFlagged(room.id, taskId, user.name)
-        }
-        
         alert('Task flagged for review. Other members can now vote on its validity.')
       } else {
         alert(data.message || 'Failed to flag task')
@@ -1212,7 +1227,8 @@ function RoundView({ round, user, room, onRoundEnd }) {
 
       {activeTab === 'leaderboard' && (
         <LeaderboardView 
-          roomMembers={roomMembers} 
+          round={round}
+          roomMembers={members} 
           socket={socket}
           currentUser={user}
         />
@@ -1222,86 +1238,119 @@ function RoundView({ round, user, room, onRoundEnd }) {
 }
 
 // Leaderboard View Component
-function LeaderboardView({ roomMembers, socket, currentUser }) {
+function LeaderboardView({ round, roomMembers, socket, currentUser }) {
   const [leaderboardData, setLeaderboardData] = useState([])
   const [animatingScores, setAnimatingScores] = useState({})
   const [lastUpdate, setLastUpdate] = useState(Date.now())
 
-  // Calculate user scores and rankings
+  // Server standings keyed by user_id; seeded from /stats, then patched by
+  // the coalesced leaderboard_updated diffs pushed by the server
+  const [standings, setStandings] = useState({})
+  // Stats version the standings are at; diffs name the version they start from
+  const standingsVersion = useRef(null)
+  // Bumped to re-fetch /stats after a missed diff
+  const [standingsRequest, setStandingsRequest] = useState(0)
+
   useEffect(() => {
-    const calculateLeaderboard = () => {
-      const userScores = roomMembers.map(member => {
-        // For now, we'll use mock data since we don't have approved tasks yet
-        // In a real implementation, this would come from the backend
-        const baseScore = member.name === 'Bob' ? 50 : member.name === 'Alice' ? 30 : 0
-        const randomBonus = Math.floor(Math.random() * 20) // Simulate dynamic scoring
-        
-        return {
-          id: member.id,
-          name: member.name,
-          score: baseScore + randomBonus,
-          tasksCompleted: member.name === 'Bob' ? 2 : member.name === 'Alice' ? 1 : 0,
-          tasksApproved: member.name === 'Bob' ? 1 : 0,
-          streak: member.name === 'Bob' ? 3 : member.name === 'Alice' ? 1 : 0,
-          avatar: member.name.charAt(0).toUpperCase(),
-          isCurrentUser: member.name === currentUser?.name
+    if (!round) return
+
+    const fetchStandings = async () => {
+      try {
+        const response = await fetch(`${API_BASE_URL}/rounds/${round.id}/stats`)
+        const data = await response.json()
+        if (data.success) {
+          const entries = {}
+          data.stats.leaderboard.forEach(entry => { entries[entry.user_id] = entry })
+          standingsVersion.current = data.version
+          setStandings(entries)
+          setLastUpdate(Date.now())
         }
-      })
-
-      // Sort by score (descending)
-      userScores.sort((a, b) => b.score - a.score)
-      
-      // Add rankings
-      userScores.forEach((user, index) => {
-        user.rank = index + 1
-        user.rankChange = 0 // Could track rank changes over time
-      })
-
-      setLeaderboardData(userScores)
+      } catch (err) {
+        console.error('Failed to fetch leaderboard:', err)
+      }
     }
 
-    calculateLeaderboard()
-    
-    // Update every 30 seconds to simulate real-time changes
-    const interval = setInterval(calculateLeaderboard, 30000)
-    return () => clearInterval(interval)
-  }, [roomMembers, currentUser])
+    // Diffs are ignored until the fetched standings say which version they are at
+    standingsVersion.current = null
+    fetchStandings()
+  }, [round?.id, standingsRequest])
 
-  // Socket.io listeners for real-time updates
+  // Diffs are emitted to the room, so this listens on the dashboard's socket,
+  // which has joined it
   useEffect(() => {
-    if (!socket) return
+    if (!socket?.socket) return
+
+    const handleLeaderboardUpdate = (data) => {
+      if (round && data.round_id !== round.id) return
+
+      // Diffs come from whichever worker pushed them; skip ones older than
+      // the standings, and re-fetch if one was missed
+      const known = standingsVersion.current
+      if (known === null) return
+      if (data.version <= known) return
+      if (data.base_version !== known) {
+        setStandingsRequest(request => request + 1)
+        return
+      }
+      standingsVersion.current = data.version
 
-    const handleScoreUpdate = (data) => {
-      setAnimatingScores(prev => ({
-        ...prev,
-        [data.userId]: data.newScore
-      }))
-      
-      // Clear animation after 2 seconds
-      setTimeout(() => {
-        setAnimatingScores(prev => {
-          const newState = { ...prev }
-          delete newState[data.userId]
-          return newState
-        })
-      }, 2000)
-      
-      setLastUpdate(Date.now())
-    }
+      setStandings(prev => {
+        const next = { ...prev }
+        data.removed.forEach(userId => { delete next[userId] })
+        data.changes.forEach(entry => { next[entry.user_id] = entry })
+        return next
+      })
 
-    socket.on('score:update', handleScoreUpdate)
-    socket.on('task:approved', handleScoreUpdate)
-    socket.on('leaderboard:update', (data) => {
-      setLeaderboardData(data.leaderboard)
+      // Highlight changed scores for 2 seconds
+      data.changes.forEach(entry => {
+        setAnimatingScores(prev => ({ ...prev, [entry.user_id]: entry.total_points }))
+        setTimeout(() => {
+          setAnimatingScores(prev => {
+            const newState = { ...prev }
+            delete newState[entry.user_id]
+            return newState
+          })
+        }, 2000)
+      })
       setLastUpdate(Date.now())
-    })
+    }
 
+    socket.on('leaderboard_updated', handleLeaderboardUpdate)
     return () => {
-      socket.off('score:update', handleScoreUpdate)
-      socket.off('task:approved', handleScoreUpdate)
-      socket.off('leaderboard:update')
+      socket.off('leaderboard_updated', handleLeaderboardUpdate)
     }
-  }, [socket])
+  }, [socket?.socket, round?.id])
+
+  // Merge server standings with room members (members without approved tasks score 0)
+  useEffect(() => {
+    const userScores = roomMembers.map(member => {
+      const entry = standings[member.user_id]
+      const name = member.user?.name || 'Unknown'
+      return {
+        id: member.user_id,
+        name: name,
+        score: entry ? entry.total_points : 0,
+        tasksCompleted: entry ? entry.task_count : 0,
+        tasksApproved: entry ? entry.task_count : 0,
+        streak: 0,
+        avatar: name.charAt(0).toUpperCase(),
+        isCurrentUser: member.user_id === currentUser?.id
+      }
+    })
+
+    // Sort by score (descending)
+    userScores.sort((a, b) => b.score - a.score)
+
+    setLeaderboardData(prev => {
+      const previousRanks = {}
+      prev.forEach(user => { previousRanks[user.id] = user.rank })
+      userScores.forEach((user, index) => {
+        user.rank = index + 1
+        user.rankChange = previousRanks[user.id] ? previousRanks[user.id] - user.rank : 0
+      })
+      return userScores
+    })
+  }, [standings, roomMembers, currentUser])
 
   const maxScore = leaderboardData.length > 0 ? leaderboardData[0].score : 100
   const getRankIcon = (rank) => {
@@ -1500,7 +1549,9 @@ function TaskCard({ task, user, showUser = false, onUploadProof, onApproveTask,
     } else if (proofType === 'file' && proofFile) {
       const reader = new FileReader()
       reader.onload = (e) => {
-        onUploadProof(task.id, { type: 'file', content: e.target.result, filename: proofFile.name })
+        // Stored as an image blob, so the server renders thumbnail and display variants
+        const type = proofFile.type === 'image/png' ? 'screenshot' : 'photo'
+        onUploadProof(task.id, { type, content: e.target.result, filename: proofFile.name })
       }
       reader.readAsDataURL(proofFile)
     }
@@ -1548,7 +1599,18 @@ function TaskCard({ task, user, showUser = false, onUploadProof, onApproveTask,
           {task.proof_url && (
             <div className="mt-3 p-3 bg-blue-50 rounded-lg">
               <p className="text-sm font-medium text-blue-800 mb-1">Proof Submitted:</p>
-              <p className="text-sm text-blue-600">{task.proof_url}</p>
+              {IMAGE_PROOF_TYPES.includes(task.proof_type) ? (
+                <a href={proofAssetUrl(task.proof_display_url || task.proof_url)} target="_blank" rel="noreferrer">
+                  <img
+                    src={proofPreviewUrl(task)}
+                    alt={`Proof for ${task.title}`}
+                    loading="lazy"
+                    className="max-h-40 rounded-md"
+                  />
+                </a>
+              ) : (
+                <p className="text-sm text-blue-600">{task.proof_url}</p>
+              )}
             </div>
           )}
           
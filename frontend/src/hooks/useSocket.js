@@ -77,47 +77,6 @@ export const useSocket = () => {
     emit('leave_room', {})
   }
 
-  const broadcastRoundStarted = (roomId, roundData) => {
-    emit('round_started', { room_id: roomId, round: roundData })
-  }
-
-  const broadcastRoundEnded = (roomId, roundData, finalStats) => {
-    emit('round_ended', { room_id: roomId, round: roundData, final_stats: finalStats })
-  }
-
-  const broadcastTaskCreated = (roomId, taskData) => {
-    emit('task_created', { room_id: roomId, task: taskData })
-  }
-
-  const broadcastTaskCompleted = (roomId, taskData) => {
-    emit('task_completed', { room_id: roomId, task: taskData })
-  }
-
-  const broadcastTaskApproved = (roomId, taskData, approved, approverName) => {
-    emit('task_approved', { 
-      room_id: roomId, 
-      task: taskData, 
-      approved: approved,
-      approver_name: approverName 
-    })
-  }
-
-  const broadcastTaskFlagged = (roomId, taskData, flaggerName) => {
-    emit('task_flagged', { 
-      room_id: roomId, 
-      task: taskData, 
-      flagger_name: flaggerName 
-    })
-  }
-
-  const broadcastLeaderboardUpdate = (roomId, stats) => {
-    emit('leaderboard_updated', { 
-      room_id: roomId, 
-      stats: stats,
-      timestamp: new Date().toISOString()
-    })
-  }
-
   const getRoomStatus = (roomId) => {
     emit('get_room_status', { room_id: roomId })
   }
@@ -131,13 +90,6 @@ export const useSocket = () => {
     off,
     joinRoom,
     leaveRoom,
-    broadcastRoundStarted,
-    broadcastRoundEnded,
-    broadcastTaskCreated,
-    broadcastTaskCompleted,
-    broadcastTaskApproved,
-    broadcastTaskFlagged,
-    broadcastLeaderboardUpdate,
     getRoomStatus
   }
 }